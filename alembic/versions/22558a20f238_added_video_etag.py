@@ -0,0 +1,24 @@
+"""added video etag
+
+Revision ID: 22558a20f238
+Revises: 20923e94a5a6
+Create Date: 2026-10-17 10:12:41.204117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '22558a20f238'
+down_revision = '20923e94a5a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('etag', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'etag')
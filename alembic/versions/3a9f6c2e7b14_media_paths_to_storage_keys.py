@@ -0,0 +1,42 @@
+"""media paths to storage keys
+
+Revision ID: 3a9f6c2e7b14
+Revises: e41c7a9d2f05
+Create Date: 2026-10-17 16:47:10.582933
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3a9f6c2e7b14'
+down_revision = 'e41c7a9d2f05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Staged upload files aren't in storage, their videos get a key once finalized
+    op.execute(
+        "UPDATE videos SET file = NULL "
+        "WHERE file IN (SELECT file FROM uploads)"
+    )
+    op.execute(
+        "UPDATE uploads SET file = substr(file, length('app/media/uploads/') + 1) "
+        "WHERE file LIKE 'app/media/uploads/%'"
+    )
+    for table in ('videos', 'blobs'):
+        op.execute(
+            f"UPDATE {table} SET file = substr(file, length('app/media/') + 1) "
+            f"WHERE file LIKE 'app/media/%'"
+        )
+
+
+def downgrade() -> None:
+    for table in ('videos', 'blobs'):
+        op.execute(f"UPDATE {table} SET file = 'app/media/' || file WHERE file IS NOT NULL")
+    op.execute("UPDATE uploads SET file = 'app/media/uploads/' || file WHERE file IS NOT NULL")
+    op.execute(
+        "UPDATE videos SET file = uploads.file FROM uploads "
+        "WHERE uploads.video_id = videos.id AND videos.file IS NULL"
+    )
@@ -0,0 +1,39 @@
+"""added uploads table
+
+Revision ID: 6f1d2c9a4b7e
+Revises: 22558a20f238
+Create Date: 2026-10-17 12:40:03.518270
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6f1d2c9a4b7e'
+down_revision = '22558a20f238'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('uploads',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=50), nullable=True),
+    sa.Column('description', sa.String(length=500), nullable=True),
+    sa.Column('file', sa.String(length=1000), nullable=True),
+    sa.Column('length', sa.BigInteger(), nullable=True),
+    sa.Column('offset', sa.BigInteger(), nullable=True),
+    sa.Column('video_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_uploads_author_id'), 'uploads', ['author_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_uploads_author_id'), table_name='uploads')
+    op.drop_table('uploads')
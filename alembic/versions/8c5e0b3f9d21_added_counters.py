@@ -0,0 +1,37 @@
+"""added counters
+
+Revision ID: 8c5e0b3f9d21
+Revises: 3a9f6c2e7b14
+Create Date: 2026-10-17 18:02:36.114590
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c5e0b3f9d21'
+down_revision = '3a9f6c2e7b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('videos', sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('subscribers_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE videos SET "
+        "likes_count = (SELECT count(*) FROM videos_likes WHERE videos_likes.video_id = videos.id), "
+        "comments_count = (SELECT count(*) FROM comments WHERE comments.video_id = videos.id)"
+    )
+    op.execute(
+        "UPDATE users SET "
+        "subscribers_count = (SELECT count(*) FROM subscribers WHERE subscribers.author_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'subscribers_count')
+    op.drop_column('videos', 'comments_count')
+    op.drop_column('videos', 'likes_count')
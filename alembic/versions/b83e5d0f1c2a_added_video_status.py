@@ -0,0 +1,24 @@
+"""added video status
+
+Revision ID: b83e5d0f1c2a
+Revises: 6f1d2c9a4b7e
+Create Date: 2026-10-17 14:05:27.931604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b83e5d0f1c2a'
+down_revision = '6f1d2c9a4b7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('videos', sa.Column('status', sa.String(length=16), server_default='ready', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('videos', 'status')
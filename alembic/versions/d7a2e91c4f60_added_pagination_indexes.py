@@ -0,0 +1,37 @@
+"""added pagination indexes
+
+Revision ID: d7a2e91c4f60
+Revises: 8c5e0b3f9d21
+Create Date: 2026-10-17 19:24:51.770342
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a2e91c4f60'
+down_revision = '8c5e0b3f9d21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so that busy tables stay writable
+    with op.get_context().autocommit_block():
+        op.create_index('ix_comments_video_id_id', 'comments', ['video_id', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_videos_author_id_id', 'videos', ['author_id', 'id'], postgresql_concurrently=True)
+        op.create_index(
+            'ix_subscribers_subscriber_id_author_id', 'subscribers', ['subscriber_id', 'author_id'],
+            postgresql_concurrently=True
+        )
+        op.drop_index('ix_comments_video_id', table_name='comments', postgresql_concurrently=True)
+        op.drop_index('ix_videos_author_id', table_name='videos', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_videos_author_id', 'videos', ['author_id'], postgresql_concurrently=True)
+        op.create_index('ix_comments_video_id', 'comments', ['video_id'], postgresql_concurrently=True)
+        op.drop_index('ix_subscribers_subscriber_id_author_id', table_name='subscribers', postgresql_concurrently=True)
+        op.drop_index('ix_videos_author_id_id', table_name='videos', postgresql_concurrently=True)
+        op.drop_index('ix_comments_video_id_id', table_name='comments', postgresql_concurrently=True)
@@ -0,0 +1,36 @@
+"""added blobs table
+
+Revision ID: e41c7a9d2f05
+Revises: b83e5d0f1c2a
+Create Date: 2026-10-17 15:21:48.307215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41c7a9d2f05'
+down_revision = 'b83e5d0f1c2a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('file', sa.String(length=1000), nullable=True),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('videos', sa.Column('blob_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_videos_blob_hash'), 'videos', ['blob_hash'], unique=False)
+    op.create_foreign_key('videos_blob_hash_fkey', 'videos', 'blobs', ['blob_hash'], ['hash'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('videos_blob_hash_fkey', 'videos', type_='foreignkey')
+    op.drop_index(op.f('ix_videos_blob_hash'), table_name='videos')
+    op.drop_column('videos', 'blob_hash')
+    op.drop_table('blobs')
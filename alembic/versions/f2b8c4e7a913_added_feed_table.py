@@ -0,0 +1,30 @@
+"""added feed table
+
+Revision ID: f2b8c4e7a913
+Revises: d7a2e91c4f60
+Create Date: 2026-10-17 20:08:13.415627
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8c4e7a913'
+down_revision = 'd7a2e91c4f60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('feed',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'video_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('feed')
@@ -1,14 +1,26 @@
 from fastapi import FastAPI, APIRouter
 from fastapi.middleware.cors import CORSMiddleware
 
+from .auth.passwords import shutdown_password_executor
 from .auth.routers import router as auth_router
+from .cache.services import close_cache
 from .comments.routers import router as comments_router
+from .database.replicas import ReadYourWritesMiddleware, close_replicas
+from .feed.routers import router as feed_router
+from .metrics.routers import router as metrics_router
+from .storage.backends import close_storage
+from .uploads.routers import router as uploads_router
 from .users.routers import router as users_router
 from .videos.routers import router as videos_router
+from .videos.streaming import shutdown_io_executor
 
 router = APIRouter()
 router.include_router(auth_router)
 router.include_router(comments_router)
+# Declared before users, so that /users/me/feed isn't taken for a user id
+router.include_router(feed_router)
+router.include_router(metrics_router)
+router.include_router(uploads_router)
 router.include_router(users_router)
 router.include_router(videos_router)
 
@@ -17,6 +29,12 @@ app = FastAPI(
 )
 
 app.include_router(router)
+app.add_event_handler("shutdown", close_storage)
+app.add_event_handler("shutdown", close_cache)
+app.add_event_handler("shutdown", close_replicas)
+app.add_event_handler("shutdown", shutdown_io_executor)
+app.add_event_handler("shutdown", shutdown_password_executor)
+app.add_middleware(ReadYourWritesMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
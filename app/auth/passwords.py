@@ -0,0 +1,38 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from passlib.hash import bcrypt
+
+from app.config import settings
+
+# bcrypt holds the GIL, so a thread pool would still stall the event loop
+password_executor = ProcessPoolExecutor(max_workers=settings.password_workers)
+
+
+async def run_password(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(password_executor, func, *args)
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.using(rounds=rounds).hash(password)
+
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt.verify(password, hashed_password)
+
+
+async def hash_password(password: str) -> str:
+    return await run_password(_hash, password, settings.bcrypt_rounds)
+
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await run_password(_verify, password, hashed_password)
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    return bcrypt.using(rounds=settings.bcrypt_rounds).needs_update(hashed_password)
+
+
+def shutdown_password_executor():
+    password_executor.shutdown(wait=False, cancel_futures=True)
@@ -2,36 +2,42 @@ from datetime import datetime, timedelta
 
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from passlib.hash import bcrypt
 from pydantic import ValidationError
-from sqlalchemy import select
+from sqlalchemy import select, bindparam
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.users.models import UserModel
 from app.database.database import get_session
+from . import passwords
+from .tokens import InvalidTokenError, get_jwt_backend, get_cached_user, cache_user
 from .schemas import TokenSchema
 from app.users.schemas import UserSchema, UserCreateSchema
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/sign-in")
 
+GET_USER_BY_EMAIL = select(UserModel).where(UserModel.email == bindparam("email"))
+
 
 class AuthService:
     def __init__(self, session: AsyncSession = Depends(get_session)):
         self.session = session
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        return bcrypt.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        return await passwords.verify_password(plain_password, hashed_password)
 
     @staticmethod
-    def hash_password(password: str) -> str:
-        return bcrypt.hash(password)
+    async def hash_password(password: str) -> str:
+        return await passwords.hash_password(password)
 
     @staticmethod
     def validate_token(token: str) -> UserSchema:
+        user = get_cached_user(token)
+        if user is not None:
+            return user
+
         exception = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -41,12 +47,8 @@ class AuthService:
         )
 
         try:
-            payload = jwt.decode(
-                token,
-                settings.jwt_secret,
-                algorithms=[settings.jwt_algorithm]
-            )
-        except JWTError:
+            payload = get_jwt_backend().decode(token)
+        except InvalidTokenError:
             raise exception from None
 
         user_data = payload.get("user")
@@ -56,6 +58,7 @@ class AuthService:
         except ValidationError:
             raise exception from None
 
+        cache_user(token, user, payload.get("exp"))
         return user
 
     @staticmethod
@@ -70,11 +73,7 @@ class AuthService:
             "sub": str(user_data.id),
             "user": user_data.dict()
         }
-        token = jwt.encode(
-            payload,
-            settings.jwt_secret,
-            algorithm=settings.jwt_algorithm
-        )
+        token = get_jwt_backend().encode(payload)
 
         return TokenSchema(access_token=token)
 
@@ -82,7 +81,7 @@ class AuthService:
         user = UserModel(
             email=user_data.email,
             username=user_data.username,
-            password=self.hash_password(user_data.password)
+            password=await self.hash_password(user_data.password)
         )
         try:
             self.session.add(user)
@@ -101,13 +100,15 @@ class AuthService:
             }
         )
 
-        user = await self.session.execute(
-            select(UserModel)
-            .where(UserModel.email == email)
-        )
+        user = await self.session.execute(GET_USER_BY_EMAIL, {"email": email})
         user = user.scalar()
 
-        if not user or not self.verify_password(password, user.password):
+        if not user or not await self.verify_password(password, user.password):
             raise exception
 
+        # Hashes made with a previous cost are upgraded while the password is at hand
+        if passwords.needs_rehash(user.password):
+            user.password = await self.hash_password(password)
+            await self.session.commit()
+
         return self.create_token(user)
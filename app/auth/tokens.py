@@ -0,0 +1,68 @@
+import hashlib
+import time
+from functools import lru_cache
+
+from app.cache.memory import TTLCache
+from app.config import settings
+from app.users.schemas import UserSchema
+
+
+class InvalidTokenError(Exception):
+    pass
+
+
+class JoseBackend:
+    def __init__(self):
+        from jose import jwt, JWTError
+        self.jwt = jwt
+        self.errors = (JWTError,)
+
+    def encode(self, payload: dict) -> str:
+        return self.jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self.jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        except self.errors:
+            raise InvalidTokenError from None
+
+
+class PyJWTBackend(JoseBackend):
+    """Faster decoding, needs the optional PyJWT package"""
+
+    def __init__(self):
+        try:
+            import jwt
+        except ImportError:
+            raise RuntimeError("jwt_backend 'pyjwt' requires the PyJWT package") from None
+        self.jwt = jwt
+        self.errors = (jwt.InvalidTokenError,)
+
+
+JWT_BACKENDS = {
+    "jose": JoseBackend,
+    "pyjwt": PyJWTBackend
+}
+
+
+@lru_cache
+def get_jwt_backend() -> JoseBackend:
+    return JWT_BACKENDS[settings.jwt_backend]()
+
+
+# Tokens are keyed by digest, so the cache doesn't keep bearer tokens in memory
+token_cache = TTLCache(settings.token_cache_size)
+
+
+def token_key(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+
+def get_cached_user(token: str) -> UserSchema | None:
+    return token_cache.get(token_key(token))
+
+
+def cache_user(token: str, user: UserSchema, exp: float | None):
+    if exp is None:
+        return
+    token_cache.set(token_key(token), user, min(float(exp), time.time() + settings.token_cache_ttl))
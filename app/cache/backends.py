@@ -0,0 +1,142 @@
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from app.cache.memory import TTLCache
+
+
+class CacheError(OSError):
+    pass
+
+
+def entity_of(key: str) -> str:
+    """`user:1:videos:0:20` belongs to `user:1`, invalidation prefixes start with it"""
+    return ":".join(key.split(":", 2)[:2])
+
+
+class CacheBackend(ABC):
+    name: str
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int):
+        pass
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str):
+        pass
+
+    @abstractmethod
+    async def clear(self):
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+    async def close(self):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """
+    Per-process LRU under a byte budget, also the stand-in for a shared backend in tests
+
+    Keys are indexed by entity, so invalidating a prefix doesn't scan the whole cache
+    """
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.entries = TTLCache(max_bytes, sizeof=len, on_remove=self._unindex)
+        self.index: defaultdict[str, set[str]] = defaultdict(set)
+
+    async def get(self, key: str) -> bytes | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        self.entries.set(key, value, time.time() + ttl)
+        if key in self.entries:
+            self.index[entity_of(key)].add(key)
+
+    async def delete_prefix(self, prefix: str):
+        for key in list(self.index.get(entity_of(prefix), ())):
+            if key.startswith(prefix):
+                self.entries.delete(key)
+
+    async def clear(self):
+        self.entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "size": self.entries.size,
+            "max_size": self.entries.maxsize,
+            "evictions": self.entries.evictions
+        }
+
+    def _unindex(self, key: str):
+        keys = self.index.get(entity_of(key))
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.index[entity_of(key)]
+
+
+class RedisCache(CacheBackend):
+    """Cache shared by all workers, needs the optional redis package"""
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str = "cache"):
+        try:
+            from redis import asyncio as redis
+            from redis.exceptions import RedisError
+        except ImportError:
+            raise RuntimeError("cache_backend 'redis' requires the redis package") from None
+        self.client = redis.from_url(url)
+        self.namespace = namespace
+        self.errors = (RedisError,)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _index(self, key: str) -> str:
+        return f"{self.namespace}:index:{entity_of(key)}"
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self.client.get(self._key(key))
+        except self.errors as err:
+            raise CacheError(str(err)) from err
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(self._key(key), value, ex=ttl)
+                pipe.sadd(self._index(key), key)
+                # The index outlives its newest entry, stale members are dropped on invalidation
+                pipe.expire(self._index(key), ttl)
+                await pipe.execute()
+        except self.errors as err:
+            raise CacheError(str(err)) from err
+
+    async def delete_prefix(self, prefix: str):
+        try:
+            members = await self.client.smembers(self._index(prefix))
+            keys = [key.decode() for key in members if key.decode().startswith(prefix)]
+            if keys:
+                await self.client.delete(*map(self._key, keys))
+                await self.client.srem(self._index(prefix), *keys)
+        except self.errors as err:
+            raise CacheError(str(err)) from err
+
+    async def clear(self):
+        try:
+            async for key in self.client.scan_iter(match=f"{self.namespace}:*"):
+                await self.client.delete(key)
+        except self.errors as err:
+            raise CacheError(str(err)) from err
+
+    async def close(self):
+        await self.client.close()
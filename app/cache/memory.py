@@ -0,0 +1,73 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries also expire at a given unix time
+
+    Entries weigh `sizeof(value)`, one by default, and the least recently used
+    ones are evicted once their total exceeds `maxsize`
+    """
+
+    def __init__(
+            self,
+            maxsize: int,
+            sizeof: Callable[[Any], int] | None = None,
+            on_remove: Callable[[Hashable], None] | None = None
+    ):
+        self.maxsize = maxsize
+        self.sizeof = sizeof or (lambda value: 1)
+        self.on_remove = on_remove
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def keys(self) -> list:
+        return list(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: Hashable, value: Any, expires_at: float):
+        size = self.sizeof(value)
+        if key in self._entries:
+            self._remove(key)
+        # A value larger than the whole budget would only flush everything else
+        if size > self.maxsize:
+            return
+        self._entries[key] = (value, expires_at, size)
+        self.size += size
+        while self.size > self.maxsize:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _remove(self, key: Hashable):
+        self.size -= self._entries.pop(key)[2]
+        if self.on_remove:
+            self.on_remove(key)
@@ -0,0 +1,87 @@
+import json
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+
+from app.cache.backends import CacheBackend, CacheError, MemoryCache, RedisCache
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheService:
+    """
+    Read-through cache of serialized responses shared between requests
+
+    Keys start with the entity they describe, `user:{id}:` or `video:{id}:`,
+    and the services that change an entity invalidate its prefix after commit.
+    An unavailable shared backend only costs a trip to the database
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await self.backend.get(key)
+        except CacheError as err:
+            self._failed("get", err)
+            value = None
+        if value is not None:
+            self.hits += 1
+            return json.loads(value)
+
+        self.misses += 1
+        # Stored and returned in the same JSON form, so hits and misses render alike
+        value = jsonable_encoder(await load())
+        if value is not None:
+            try:
+                await self.backend.set(key, json.dumps(value).encode(), self.ttl)
+            except CacheError as err:
+                self._failed("set", err)
+        return value
+
+    async def invalidate(self, *prefixes: str):
+        for prefix in prefixes:
+            try:
+                await self.backend.delete_prefix(prefix)
+            except CacheError as err:
+                self._failed("invalidate", err)
+        self.invalidations += len(prefixes)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def metrics(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            **self.backend.stats()
+        }
+
+    def _failed(self, operation: str, err: CacheError):
+        self.errors += 1
+        logger.warning("Cache %s failed: %s", operation, err)
+
+
+@lru_cache
+def get_cache() -> CacheService:
+    if settings.cache_backend == "redis":
+        backend = RedisCache(settings.cache_redis_url)
+    else:
+        backend = MemoryCache(settings.cache_max_bytes)
+    return CacheService(backend, settings.cache_ttl)
+
+
+async def close_cache():
+    await get_cache().backend.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP
+from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, Index
 from sqlalchemy.orm import relationship
 
 from app.database.database import Base
@@ -10,7 +10,11 @@ class CommentModel(Base):
     id = Column(Integer, primary_key=True)
     text = Column(String(50))
     author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
-    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), index=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"))
     created_at = Column(TIMESTAMP)
     answer_to = Column(Integer, ForeignKey("comments.id", ondelete="SET NULL"), index=True, nullable=True)
     author = relationship("UserModel", back_populates="comments")
+
+    __table_args__ = (
+        Index("ix_comments_video_id_id", "video_id", "id"),
+    )
@@ -1,15 +1,17 @@
 from typing import List
 
-from fastapi import Depends, APIRouter, status, Response
+from fastapi import Depends, APIRouter, status, Response, Query
 
 from app.comments.dependencies import valid_comment_id, valid_owned_comment
-from app.videos.dependencies import valid_video_id
+from app.videos.dependencies import valid_video_id, valid_cached_video
 from app.videos.models import VideoModel
 from app.comments.models import CommentModel
+from app.videos.schemas import VideoStatusSchema
 from app.exceptions_schemas import MessageSchema
+from app.pagination import Pagination
 from app.users.schemas import UserSchema
 from app.auth.dependencies import get_current_user
-from .schemas import CommentCreateSchema, CommentUpdateSchema, CommentSchema
+from .schemas import CommentCreateSchema, CommentUpdateSchema, CommentSchema, CommentTreeSchema
 from .services import CommentService
 
 router = APIRouter(
@@ -65,6 +67,10 @@ async def leave_comment(
             "model": List[CommentSchema],
             "description": "Received list of comments"
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "Video doesn't exist"
@@ -72,15 +78,59 @@ async def leave_comment(
     }
 )
 async def get_list_comments(
-        video: VideoModel = Depends(valid_video_id),
-        service: CommentService = Depends()
+        video: VideoStatusSchema = Depends(valid_cached_video),
+        service: CommentService = Depends(CommentService.reader),
+        page: Pagination = Depends()
 ):
     """
     Get a list of comments on a video
 
-    **video_id**: video id
+    **video_id**: video id\n
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: page size, up to 100
+    """
+    return page.paginate(await service.get_list(video.id, page), key=lambda comment: comment["id"])
+
+
+@router.get(
+    "/{video_id}/comments/tree",
+    response_model=List[CommentTreeSchema],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": List[CommentTreeSchema],
+            "description": "Received comment threads"
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": MessageSchema,
+            "description": "Video doesn't exist"
+        }
+    }
+)
+async def get_comment_tree(
+        video: VideoStatusSchema = Depends(valid_cached_video),
+        service: CommentService = Depends(CommentService.reader),
+        page: Pagination = Depends(),
+        depth: int = Query(3, ge=0, le=10),
+        replies: int = Query(5, ge=1, le=50)
+):
+    """
+    Get a page of top-level comments on a video with their replies
+
+    **video_id**: video id\n
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: number of top-level comments, up to 100\n
+    **depth**: how many levels of replies to include, up to 10\n
+    **replies**: how many replies to include per comment, up to 50
     """
-    return await service.get_list(video.id)
+    return page.paginate(
+        await service.get_tree(video.id, page, depth, replies),
+        key=lambda comment: comment["id"]
+    )
 
 
 @router.get(
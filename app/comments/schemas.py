@@ -1,5 +1,5 @@
 import datetime
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel, validator
 
@@ -26,6 +26,14 @@ class CommentSchema(BaseCommentSchema):
         orm_mode = True
 
 
+class CommentTreeSchema(CommentSchema):
+    replies_count: int = 0
+    replies: List["CommentTreeSchema"] = []
+
+
+CommentTreeSchema.update_forward_refs()
+
+
 class CommentCreateSchema(BaseCommentSchema):
     pass
 
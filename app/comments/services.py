@@ -2,21 +2,42 @@ from datetime import datetime
 from typing import List
 
 from fastapi import Depends
-from sqlalchemy import select
+from sqlalchemy import select, update, func, literal_column, Integer, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from app.cache.services import get_cache
 from app.comments.models import CommentModel
 from app.users.schemas import UserSchema
-from app.comments.schemas import CommentCreateSchema, CommentUpdateSchema, CommentSchema
+from app.comments.schemas import CommentCreateSchema, CommentUpdateSchema, CommentSchema, CommentTreeSchema
 from app.database.database import get_session
+from app.database.identity import get_loaded
+from app.database.replicas import get_read_session
+from app.pagination import Pagination
+from app.videos.models import VideoModel
+
+LIST_COMMENTS = Pagination.keyset(
+    select(CommentModel)
+    .options(joinedload(CommentModel.author))
+    .where(CommentModel.video_id == bindparam("video_id")),
+    CommentModel.id
+)
 
 
 class CommentService:
     def __init__(self, session: AsyncSession = Depends(get_session)):
         self.session = session
+        self.cache = get_cache()
+
+    @classmethod
+    def reader(cls, session: AsyncSession = Depends(get_read_session)) -> "CommentService":
+        """Service for read-only dependencies, served by a replica on safe requests"""
+        return cls(session)
 
     async def _get(self, comment_id: int) -> CommentModel | None:
+        comment = get_loaded(self.session, CommentModel, comment_id, ("author",))
+        if comment:
+            return comment
         comment = await self.session.execute(
             select(CommentModel)
             .options(joinedload(CommentModel.author))
@@ -30,14 +51,79 @@ class CommentService:
     async def get(self, comment_id: int) -> CommentModel | None:
         return await self._get(comment_id)
 
-    async def get_list(self, video_id: int) -> List[CommentModel]:
-        comments = await self.session.execute(
-            select(CommentModel)
+    async def get_list(self, video_id: int, page: Pagination) -> List[dict]:
+        async def load():
+            comments = await self.session.execute(LIST_COMMENTS, {"video_id": video_id, **page.params})
+            return [CommentSchema.from_orm(comment) for comment in comments.scalars()]
+        return await self.cache.get_or_load(f"video:{video_id}:comments:list:{page.cache_key}", load)
+
+    async def get_tree(
+            self,
+            video_id: int,
+            page: Pagination,
+            max_depth: int,
+            max_replies: int
+    ) -> List[dict]:
+        return await self.cache.get_or_load(
+            f"video:{video_id}:comments:tree:{page.cache_key}:{max_depth}:{max_replies}",
+            lambda: self._load_tree(video_id, page, max_depth, max_replies)
+        )
+
+    async def _load_tree(
+            self,
+            video_id: int,
+            page: Pagination,
+            max_depth: int,
+            max_replies: int
+    ) -> List[CommentTreeSchema]:
+        # Window functions aren't allowed in the recursive part, so replies are ranked beforehand
+        replies = (
+            select(
+                CommentModel.id,
+                CommentModel.answer_to,
+                func.row_number().over(partition_by=CommentModel.answer_to, order_by=CommentModel.id).label("position")
+            )
+            .where(CommentModel.video_id == video_id, CommentModel.answer_to.isnot(None))
+            .cte("replies")
+        )
+        roots = page.apply(
+            select(CommentModel.id)
+            .where(CommentModel.video_id == video_id, CommentModel.answer_to.is_(None)),
+            CommentModel.id
+        ).subquery("roots")
+
+        tree = select(roots.c.id, literal_column("0", Integer).label("depth")).cte("tree", recursive=True)
+        tree = tree.union_all(
+            select(replies.c.id, tree.c.depth + 1)
+            .select_from(replies.join(tree, replies.c.answer_to == tree.c.id))
+            .where(tree.c.depth < max_depth, replies.c.position <= max_replies)
+        )
+        replies_count = (
+            select(replies.c.answer_to, func.count().label("replies_count"))
+            .group_by(replies.c.answer_to)
+            .subquery("replies_count")
+        )
+
+        rows = await self.session.execute(
+            select(CommentModel, replies_count.c.replies_count)
+            .join(tree, tree.c.id == CommentModel.id)
+            .outerjoin(replies_count, replies_count.c.answer_to == CommentModel.id)
             .options(joinedload(CommentModel.author))
-            .where(CommentModel.video_id == video_id)
+            .order_by(CommentModel.id)
         )
-        comments = comments.scalars().all()
-        return comments
+
+        # Replies are created after the comment they answer, so parents come first
+        nodes = {}
+        roots = []
+        for comment, count in rows.all():
+            node = CommentTreeSchema.from_orm(comment)
+            node.replies_count = count or 0
+            nodes[comment.id] = node
+            if comment.answer_to in nodes:
+                nodes[comment.answer_to].replies.append(node)
+            else:
+                roots.append(node)
+        return roots
 
     async def create(self, video_id: int, comment: CommentCreateSchema, user: UserSchema) -> CommentSchema:
         comment = CommentModel(
@@ -47,7 +133,9 @@ class CommentService:
             created_at=datetime.now()
         )
         self.session.add(comment)
+        await self._add_comments(video_id, 1)
         await self.session.commit()
+        await self.cache.invalidate(f"video:{video_id}:comments:")
 
         return CommentSchema(
             id=comment.id,
@@ -63,9 +151,19 @@ class CommentService:
             if value is not None:
                 setattr(comment, field, value)
         await self.session.commit()
+        await self.cache.invalidate(f"video:{comment.video_id}:comments:")
         return comment
 
     async def delete(self, comment_id: int):
         comment = await self._get(comment_id)
         await self.session.delete(comment)
+        await self._add_comments(comment.video_id, -1)
         await self.session.commit()
+        await self.cache.invalidate(f"video:{comment.video_id}:comments:")
+
+    async def _add_comments(self, video_id: int, amount: int):
+        await self.session.execute(
+            update(VideoModel)
+            .where(VideoModel.id == video_id)
+            .values(comments_count=VideoModel.comments_count + amount)
+        )
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseSettings
 
 
@@ -8,9 +10,61 @@ class Settings(BaseSettings):
     password: str
     database: str
 
+    db_echo: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout: int | None = None
+    db_query_cache_size: int = 500
+    # Set to 0 behind a transaction-pooling pgbouncer, which can't keep prepared statements
+    db_prepared_statement_cache_size: int = 256
+    db_replica_urls: List[str] = []
+    db_replica_retry_interval: float = 5
+    db_read_your_writes_window: int = 5
+
+    bcrypt_rounds: int = 12
+    password_workers: int = 2
+
     jwt_secret: str
     jwt_algorithm: str = "HS256"
     jwt_expiration: int = 36000
+    jwt_backend: str = "jose"
+    token_cache_size: int = 10000
+    token_cache_ttl: int = 300
+
+    cache_backend: str = "memory"
+    cache_ttl: int = 60
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_redis_url: str | None = None
+
+    video_cache_control: str = "public, max-age=86400"
+    page_cache_control: str = "no-cache"
+
+    stream_min_block_size: int = 64 * 1024
+    stream_max_block_size: int = 1024 * 1024
+    stream_target_send_time: float = 0.05
+    stream_read_ahead: int = 2
+    stream_io_workers: int = 32
+    stream_token_secret: str | None = None
+    stream_token_ttl: int = 3600
+
+    upload_buffer_size: int = 1024 * 1024
+    upload_max_field_size: int = 64 * 1024
+    upload_dir: str = "app/media/uploads"
+
+    storage_backend: str = "local"
+    media_root: str = "app/media"
+    s3_endpoint_url: str | None = None
+    s3_bucket: str | None = None
+    s3_access_key: str | None = None
+    s3_secret_key: str | None = None
+    s3_region: str = "us-east-1"
+
+    feed_fanout_limit: int = 10000
+    feed_backfill_size: int = 20
+    feed_timeline_size: int = 1000
 
 
 settings = Settings(
@@ -1,12 +1,12 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-from app.database.db_config import get_sqlalchemy_url
+from app.database.db_config import get_sqlalchemy_url, get_engine_options
 
 engine = create_async_engine(
     get_sqlalchemy_url(),
-    echo=True,
-    future=True
+    future=True,
+    **get_engine_options()
 )
 
 async_session = sessionmaker(
@@ -1,4 +1,7 @@
+from sqlalchemy.engine import make_url
+
 from app.config import settings
+from app.database.pool import InstrumentedPool
 
 
 def get_sqlalchemy_url(
@@ -13,3 +16,26 @@ def get_sqlalchemy_url(
         host=host,
         database=database
     )
+
+
+def get_engine_options(url: str | None = None) -> dict:
+    options = {
+        "echo": settings.db_echo,
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "query_cache_size": settings.db_query_cache_size,
+        "connect_args": {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size
+        }
+    }
+    if settings.db_statement_timeout:
+        # Milliseconds, enforced by the server for every statement of the connection
+        options["connect_args"]["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout)}
+    if url is not None and make_url(url).get_driver_name() != "asyncpg":
+        # Replicas may be local stand-ins on other drivers
+        del options["connect_args"]
+    return options
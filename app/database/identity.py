@@ -0,0 +1,24 @@
+from typing import Iterable, Type, TypeVar
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.util import identity_key
+
+T = TypeVar("T")
+
+
+def get_loaded(session: AsyncSession, model: Type[T], ident, relationships: Iterable[str] = ()) -> T | None:
+    """
+    Entity already loaded by the request's session, e.g. by a dependency
+
+    Sessions live for one request, so their identity map works as a request
+    cache. The entity is only reused if its columns and the given relationships
+    are loaded, anything else would need a lazy load, which async sessions can't do
+    """
+    instance = session.identity_map.get(identity_key(model, ident))
+    if instance is None:
+        return
+    state = inspect(instance)
+    if state.deleted or state.unloaded & {*state.mapper.column_attrs.keys(), *relationships}:
+        return
+    return instance
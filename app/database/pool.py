@@ -0,0 +1,46 @@
+import time
+
+from greenlet import getcurrent
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.metrics.histogram import Histogram
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_time = Histogram()
+        self.timeouts = 0
+        self._waiting = set()
+
+    def _do_get(self):
+        # QueuePool._do_get retries by calling itself, only the outermost call is timed.
+        # Concurrent async checkouts share a thread but each runs in its own greenlet
+        current = getcurrent()
+        if current in self._waiting:
+            return super()._do_get()
+        self._waiting.add(current)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self._waiting.discard(current)
+            self.wait_time.observe(time.perf_counter() - started)
+
+    def metrics(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            # Negative while the pool isn't filled up to its size
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeouts": self.timeouts,
+            "wait_time": self.wait_time.snapshot()
+        }
@@ -0,0 +1,117 @@
+import time
+from typing import List
+
+from fastapi import Depends
+from fastapi.requests import Request
+from sqlalchemy.exc import DBAPIError, TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+
+from app.config import settings
+from app.database.database import get_session
+from app.database.db_config import get_engine_options
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+
+class ReplicaSet:
+    """
+    Read replicas picked round-robin
+
+    A replica that can't hand out a connection is skipped for `retry_interval`
+    seconds, one whose pool is exhausted only for the current request. With
+    pre-ping enabled every checkout doubles as a health check
+    """
+
+    def __init__(self, urls: List[str], retry_interval: float):
+        self.engines = [create_async_engine(url, future=True, **get_engine_options(url)) for url in urls]
+        self.retry_interval = retry_interval
+        self.down_until = [0.0] * len(self.engines)
+        self._next = 0
+
+    def candidates(self) -> List[AsyncEngine]:
+        if not self.engines:
+            return []
+        now = time.monotonic()
+        start, self._next = self._next, (self._next + 1) % len(self.engines)
+        indexes = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+        return [self.engines[index] for index in indexes if self.down_until[index] <= now]
+
+    def mark_down(self, engine: AsyncEngine):
+        self.down_until[self.engines.index(engine)] = time.monotonic() + self.retry_interval
+
+    async def open_session(self) -> AsyncSession | None:
+        for engine in self.candidates():
+            session = AsyncSession(engine, expire_on_commit=False)
+            try:
+                await session.connection()
+            except (OSError, DBAPIError):
+                await session.close()
+                self.mark_down(engine)
+                continue
+            except TimeoutError:
+                # An exhausted pool means a busy replica, not a dead one
+                await session.close()
+                continue
+            return session
+
+    async def dispose(self):
+        for engine in self.engines:
+            await engine.dispose()
+
+
+replicas = ReplicaSet(settings.db_replica_urls, settings.db_replica_retry_interval)
+
+
+async def close_replicas():
+    await replicas.dispose()
+
+
+def read_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def get_read_session(
+        request: Request,
+        session: AsyncSession = Depends(get_session)
+) -> AsyncSession:
+    """
+    Session for read-only dependencies
+
+    Safe requests go to a replica unless the client wrote recently. Other
+    requests get the primary session shared with the services of the request,
+    so objects loaded by dependencies can still be changed by them
+    """
+    if request.method not in READ_METHODS or read_primary(request):
+        yield session
+        return
+    replica = await replicas.open_session()
+    if replica is None:
+        yield session
+        return
+    async with replica:
+        yield replica
+
+
+class ReadYourWritesMiddleware:
+    """Pins reads of a client to the primary for a while after it changed something"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS or not replicas.engines:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                window = settings.db_read_your_writes_window
+                cookie = f"{READ_YOUR_WRITES_COOKIE}={time.time() + window:.3f}; Max-Age={window}; Path=/; HttpOnly"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, Table, ForeignKey
+
+from app.database.database import Base
+
+# Per-user timeline, filled when a video is published by an author the user follows
+feed_table = Table(
+    "feed",
+    Base.metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("video_id", Integer, ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+)
@@ -0,0 +1,48 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, status
+
+from app.auth.dependencies import get_current_user
+from app.exceptions_schemas import MessageSchema
+from app.pagination import Pagination
+from app.users.schemas import UserSchema
+from .schemas import FeedVideoSchema
+from .services import FeedService
+
+router = APIRouter(
+    prefix="/users",
+    tags=["feed"]
+)
+
+
+@router.get(
+    "/me/feed",
+    response_model=List[FeedVideoSchema],
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": List[FeedVideoSchema],
+            "description": "Received videos of the followed authors"
+        },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "model": MessageSchema,
+            "description": "Could not validate credentials"
+        }
+    }
+)
+async def get_feed(
+        current_user: UserSchema = Depends(get_current_user),
+        service: FeedService = Depends(FeedService.reader),
+        page: Pagination = Depends()
+):
+    """
+    Get videos of the followed authors, newest first
+
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: page size, up to 100
+    """
+    return page.paginate(await service.get(current_user.id, page), key=lambda video: video.id)
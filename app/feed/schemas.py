@@ -0,0 +1,6 @@
+from app.users.schemas import UserSchema
+from app.videos.schemas import SimpleVideoSchema
+
+
+class FeedVideoSchema(SimpleVideoSchema):
+    author: UserSchema
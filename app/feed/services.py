@@ -0,0 +1,165 @@
+from typing import List
+
+from fastapi import Depends
+from sqlalchemy import select, delete, literal, cast, true, Integer
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.config import settings
+from app.database.database import get_session
+from app.database.replicas import get_read_session
+from app.pagination import Pagination
+from app.users.models import UserModel, subscribers_table
+from app.videos.models import VideoModel, VideoStatus
+from .models import feed_table
+
+
+class FeedService:
+    """
+    Subscription feed of a user
+
+    Videos of regular authors are pushed into the subscribers' timelines when
+    they are published. Authors with more than `feed_fanout_limit` subscribers
+    are not fanned out, their videos are pulled while the feed is read.
+    Timelines keep the latest `feed_timeline_size` videos
+    """
+
+    def __init__(self, session: AsyncSession = Depends(get_session)):
+        self.session = session
+
+    @classmethod
+    def reader(cls, session: AsyncSession = Depends(get_read_session)) -> "FeedService":
+        """Service for read-only dependencies, served by a replica on safe requests"""
+        return cls(session)
+
+    async def fan_out(self, author_id: int, video_id: int):
+        # The author's subscriber count is checked by the same statement, without a round trip
+        subscribers_count = (
+            select(UserModel.subscribers_count)
+            .where(UserModel.id == author_id)
+            .scalar_subquery()
+        )
+        await self.session.execute(
+            insert(feed_table)
+            .from_select(
+                ["user_id", "video_id"],
+                select(subscribers_table.c.subscriber_id, cast(literal(video_id), Integer))
+                .where(
+                    subscribers_table.c.author_id == author_id,
+                    subscribers_count <= settings.feed_fanout_limit
+                )
+            )
+        )
+        await self._trim(feed_table.c.user_id.in_(self._subscribers(author_id)))
+
+    async def backfill_subscribers(self, author_id: int):
+        """
+        Push the author's latest videos to every subscriber once the author drops to the fan-out limit
+
+        They weren't fanned out while the author was above it and would no longer be pulled
+        """
+        subscribers_count = (
+            select(UserModel.subscribers_count)
+            .where(UserModel.id == author_id)
+            .scalar_subquery()
+        )
+        latest = (
+            select(VideoModel.id)
+            .where(VideoModel.author_id == author_id, VideoModel.status == VideoStatus.ready)
+            .order_by(VideoModel.id.desc())
+            .limit(settings.feed_backfill_size)
+            .subquery()
+        )
+        result = await self.session.execute(
+            insert(feed_table)
+            .from_select(
+                ["user_id", "video_id"],
+                select(subscribers_table.c.subscriber_id, latest.c.id)
+                .select_from(subscribers_table.join(latest, true()))
+                .where(
+                    subscribers_table.c.author_id == author_id,
+                    subscribers_count == settings.feed_fanout_limit
+                )
+            )
+            .on_conflict_do_nothing()
+        )
+        if result.rowcount:
+            await self._trim(feed_table.c.user_id.in_(self._subscribers(author_id)))
+
+    async def follow(self, user_id: int, author_id: int):
+        # Latest videos of a new subscription show up at once instead of after the next upload
+        await self.session.execute(
+            insert(feed_table)
+            .from_select(
+                ["user_id", "video_id"],
+                select(cast(literal(user_id), Integer), VideoModel.id)
+                .where(VideoModel.author_id == author_id, VideoModel.status == VideoStatus.ready)
+                .order_by(VideoModel.id.desc())
+                .limit(settings.feed_backfill_size)
+            )
+            .on_conflict_do_nothing()
+        )
+        await self._trim(feed_table.c.user_id == user_id)
+
+    async def unfollow(self, user_id: int, author_id: int):
+        await self.session.execute(
+            delete(feed_table)
+            .where(
+                feed_table.c.user_id == user_id,
+                feed_table.c.video_id.in_(
+                    select(VideoModel.id).where(VideoModel.author_id == author_id)
+                )
+            )
+        )
+
+    async def get(self, user_id: int, page: Pagination) -> List[VideoModel]:
+        pushed = page.apply(
+            select(feed_table.c.video_id.label("id"))
+            .where(feed_table.c.user_id == user_id),
+            feed_table.c.video_id,
+            descending=True
+        ).subquery()
+        # Each side is bounded by the page size, so merging them stays cheap
+        pulled = page.apply(
+            select(VideoModel.id)
+            .join(subscribers_table, subscribers_table.c.author_id == VideoModel.author_id)
+            .join(UserModel, UserModel.id == VideoModel.author_id)
+            .where(
+                subscribers_table.c.subscriber_id == user_id,
+                UserModel.subscribers_count > settings.feed_fanout_limit,
+                VideoModel.status == VideoStatus.ready
+            ),
+            VideoModel.id,
+            descending=True
+        ).subquery()
+        video_ids = select(pushed.c.id).union(select(pulled.c.id))
+
+        videos = await self.session.execute(
+            select(VideoModel)
+            .options(joinedload(VideoModel.author))
+            .where(VideoModel.id.in_(video_ids), VideoModel.status == VideoStatus.ready)
+            .order_by(VideoModel.id.desc())
+            .limit(page.limit + 1)
+        )
+        return videos.scalars().all()
+
+    async def _trim(self, users):
+        """Drop timeline rows past the newest `feed_timeline_size` of the matched users"""
+        newer = feed_table.alias("newer")
+        cutoff = (
+            select(newer.c.video_id)
+            .where(newer.c.user_id == feed_table.c.user_id)
+            .order_by(newer.c.video_id.desc())
+            .offset(settings.feed_timeline_size)
+            .limit(1)
+            .scalar_subquery()
+        )
+        await self.session.execute(
+            delete(feed_table)
+            .where(users, feed_table.c.video_id <= cutoff)
+        )
+
+    @staticmethod
+    def _subscribers(author_id: int):
+        return select(subscribers_table.c.subscriber_id).where(subscribers_table.c.author_id == author_id)
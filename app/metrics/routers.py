@@ -0,0 +1,46 @@
+from fastapi import APIRouter, status
+
+from app.cache.services import get_cache
+from app.database.database import engine
+from .schemas import CacheMetricsSchema, PoolMetricsSchema
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"]
+)
+
+
+@router.get(
+    "/pool",
+    response_model=PoolMetricsSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": PoolMetricsSchema,
+            "description": "Database connection pool metrics received"
+        }
+    }
+)
+async def get_pool_metrics():
+    """
+    Get database connection pool usage and checkout wait time histogram in seconds
+    """
+    return engine.pool.metrics()
+
+
+@router.get(
+    "/cache",
+    response_model=CacheMetricsSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": CacheMetricsSchema,
+            "description": "Cache metrics received"
+        }
+    }
+)
+async def get_cache_metrics():
+    """
+    Get hits and misses of the response cache in this process, entries and size in bytes for the memory backend
+    """
+    return get_cache().metrics()
@@ -0,0 +1,36 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class BucketSchema(BaseModel):
+    le: float
+    count: int
+
+
+class HistogramSchema(BaseModel):
+    buckets: List[BucketSchema]
+    count: int
+    sum: float
+
+
+class PoolMetricsSchema(BaseModel):
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    max_overflow: int
+    timeouts: int
+    wait_time: HistogramSchema
+
+
+class CacheMetricsSchema(BaseModel):
+    backend: str
+    hits: int
+    misses: int
+    invalidations: int
+    errors: int
+    entries: Optional[int]
+    size: Optional[int]
+    max_size: Optional[int]
+    evictions: Optional[int]
@@ -0,0 +1,82 @@
+import base64
+import binascii
+import json
+from typing import Callable, List, TypeVar
+
+from fastapi import HTTPException, Query, status
+from fastapi.requests import Request
+from fastapi.responses import Response
+from sqlalchemy import bindparam
+from sqlalchemy.sql import Select
+
+T = TypeVar("T")
+
+MAX_LIMIT = 100
+
+
+class Pagination:
+    """
+    Keyset pagination over a column that is unique within the listed rows
+
+    The cursor of the next page is returned in the `X-Next-Cursor` and
+    `Link` response headers, so list bodies keep their shape
+    """
+
+    def __init__(
+            self,
+            request: Request,
+            response: Response,
+            cursor: str | None = Query(None, description="Cursor from the X-Next-Cursor header"),
+            limit: int = Query(20, ge=1, le=MAX_LIMIT)
+    ):
+        self.request = request
+        self.response = response
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+
+    def apply(self, query: Select, column, descending: bool = False) -> Select:
+        if self.after is not None:
+            query = query.where(column < self.after if descending else column > self.after)
+        # One extra row tells whether there is a next page
+        return query.order_by(column.desc() if descending else column).limit(self.limit + 1)
+
+    @staticmethod
+    def keyset(query: Select, column) -> Select:
+        """Ascending page statement that is built once and executed with `params`"""
+        return query.where(column > bindparam("after")).order_by(column).limit(bindparam("limit"))
+
+    @property
+    def params(self) -> dict:
+        # Ids start from 1, so the first page is everything after 0
+        return {"after": self.after if self.after is not None else 0, "limit": self.limit + 1}
+
+    @property
+    def cache_key(self) -> str:
+        return f"{self.after if self.after is not None else 0}:{self.limit}"
+
+    def paginate(self, items: List[T], key: Callable[[T], int]) -> List[T]:
+        if len(items) <= self.limit:
+            return items
+        items = items[:self.limit]
+        cursor = encode_cursor(key(items[-1]))
+        next_url = self.request.url.include_query_params(cursor=cursor, limit=self.limit)
+        self.response.headers["X-Next-Cursor"] = cursor
+        self.response.headers["Link"] = f'<{next_url}>; rel="next"'
+        return items
+
+
+def encode_cursor(value: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        value = None
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return value
@@ -0,0 +1,263 @@
+import hashlib
+import hmac
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+from app.config import settings
+from app.videos.streaming import ChunkSizer, iter_file_range, run_io
+
+
+class StorageError(OSError):
+    pass
+
+
+@dataclass
+class FileStat:
+    size: int
+    mtime: float
+
+
+class StorageBackend(ABC):
+    """
+    Media storage addressed by keys like `blobs/ab/ab12...mp4`
+
+    Reads are async iterators so objects are streamed rather than buffered,
+    ranged reads cover the `[start, end)` slice only
+    """
+
+    @abstractmethod
+    async def stat(self, key: str) -> FileStat:
+        ...
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def read_range(self, key: str, start: int, end: int, sizer: ChunkSizer = None) -> AsyncIterator[bytes]:
+        ...
+
+    async def read(self, key: str, sizer: ChunkSizer = None) -> AsyncIterator[bytes]:
+        file_stat = await self.stat(key)
+        async for chunk in self.read_range(key, 0, file_stat.size, sizer):
+            yield chunk
+
+    @abstractmethod
+    async def write(self, key: str, chunks: AsyncIterable[bytes], size: int):
+        ...
+
+    async def put_file(self, key: str, path: str):
+        """Move a staged local file into storage"""
+        size = await run_io(os.path.getsize, path)
+        await self.write(key, iter_file_range(path, 0, size), size)
+        await run_io(os.remove, path)
+
+    @abstractmethod
+    async def delete(self, key: str):
+        ...
+
+    def local_path(self, key: str) -> str | None:
+        """Filesystem path of the object, when the server can send it directly"""
+        return
+
+    async def close(self):
+        pass
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    async def stat(self, key: str) -> FileStat:
+        stat_result = await run_io(os.stat, self._path(key))
+        return FileStat(size=stat_result.st_size, mtime=stat_result.st_mtime)
+
+    async def exists(self, key: str) -> bool:
+        return await run_io(os.path.exists, self._path(key))
+
+    def read_range(self, key: str, start: int, end: int, sizer: ChunkSizer = None) -> AsyncIterator[bytes]:
+        return iter_file_range(self._path(key), start, end, sizer)
+
+    async def write(self, key: str, chunks: AsyncIterable[bytes], size: int):
+        path = self._path(key)
+        await run_io(lambda: os.makedirs(os.path.dirname(path), exist_ok=True))
+        file = await run_io(open, path, "wb")
+        try:
+            async for chunk in chunks:
+                await run_io(file.write, chunk)
+        finally:
+            await run_io(file.close)
+
+    async def put_file(self, key: str, path: str):
+        target = self._path(key)
+        await run_io(lambda: os.makedirs(os.path.dirname(target), exist_ok=True))
+        await run_io(os.replace, path, target)
+
+    async def delete(self, key: str):
+        path = self._path(key)
+        if await run_io(os.path.exists, path):
+            await run_io(os.remove, path)
+
+    def local_path(self, key: str) -> str | None:
+        return self._path(key)
+
+
+class S3Storage(StorageBackend):
+    """
+    S3-compatible object storage over path-style URLs, signed with AWS Signature V4
+
+    Payloads are sent as `UNSIGNED-PAYLOAD` so that uploads can be streamed
+    """
+
+    def __init__(
+            self,
+            endpoint_url: str,
+            bucket: str,
+            access_key: str,
+            secret_key: str,
+            region: str = "us-east-1",
+            transport: httpx.AsyncBaseTransport | None = None
+    ):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.host = urlsplit(self.endpoint_url).netloc
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.client = httpx.AsyncClient(transport=transport, timeout=None)
+
+    def _path(self, key: str) -> str:
+        return quote(f"/{self.bucket}/{key}", safe="/-_.~")
+
+    def _signing_key(self, date: str) -> bytes:
+        key = f"AWS4{self.secret_key}".encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        return key
+
+    def _sign(self, method: str, path: str, headers: dict) -> dict:
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+        headers = {
+            **{name.lower(): str(value).strip() for name, value in headers.items()},
+            "host": self.host,
+            "x-amz-date": amz_date,
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD"
+        }
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join([
+            method,
+            path,
+            "",
+            "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+            signed_headers,
+            "UNSIGNED-PAYLOAD"
+        ])
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256",
+            amz_date,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest()
+        ])
+        signature = hmac.new(self._signing_key(date), string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+
+    def _request(self, method: str, key: str, headers: dict = None, content=None) -> httpx.Request:
+        path = self._path(key)
+        return self.client.build_request(
+            method,
+            f"{self.endpoint_url}{path}",
+            headers=self._sign(method, path, headers or {}),
+            content=content
+        )
+
+    @staticmethod
+    def _check(response: httpx.Response, key: str):
+        if response.status_code == 404:
+            raise FileNotFoundError(f"Object {key} doesn't exist.")
+        if response.is_error:
+            raise StorageError(f"Storage responded with {response.status_code} for {key}.")
+
+    async def stat(self, key: str) -> FileStat:
+        response = await self.client.send(self._request("HEAD", key))
+        self._check(response, key)
+        last_modified = response.headers.get("last-modified")
+        return FileStat(
+            size=int(response.headers["content-length"]),
+            mtime=parsedate_to_datetime(last_modified).timestamp() if last_modified else 0
+        )
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self.stat(key)
+        except FileNotFoundError:
+            return False
+        return True
+
+    async def read_range(self, key: str, start: int, end: int, sizer: ChunkSizer = None) -> AsyncIterator[bytes]:
+        if start >= end:
+            return
+        sizer = sizer or ChunkSizer(end - start)
+        request = self._request("GET", key, {"range": f"bytes={start}-{end - 1}"})
+        response = await self.client.send(request, stream=True)
+        try:
+            self._check(response, key)
+            if response.status_code != 206 and (start, end) != (0, int(response.headers["content-length"])):
+                raise StorageError(f"Storage ignored the range request for {key}.")
+            buffer = bytearray()
+            async for data in response.aiter_raw():
+                buffer += data
+                while len(buffer) >= sizer.size:
+                    chunk, buffer = bytes(buffer[:sizer.size]), buffer[sizer.size:]
+                    yield chunk
+            if buffer:
+                yield bytes(buffer)
+        finally:
+            await response.aclose()
+
+    async def write(self, key: str, chunks: AsyncIterable[bytes], size: int):
+        request = self._request("PUT", key, {"content-length": size}, content=chunks)
+        response = await self.client.send(request)
+        self._check(response, key)
+
+    async def delete(self, key: str):
+        response = await self.client.send(self._request("DELETE", key))
+        if response.status_code != 404:
+            self._check(response, key)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    if settings.storage_backend == "s3":
+        return S3Storage(
+            endpoint_url=settings.s3_endpoint_url,
+            bucket=settings.s3_bucket,
+            access_key=settings.s3_access_key,
+            secret_key=settings.s3_secret_key,
+            region=settings.s3_region
+        )
+    return LocalStorage(settings.media_root)
+
+
+async def close_storage():
+    await get_storage().close()
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, BigInteger, String
+
+from app.database.database import Base
+
+
+class BlobModel(Base):
+    __tablename__ = "blobs"
+
+    hash = Column(String(64), primary_key=True)
+    file = Column(String(1000))
+    size = Column(BigInteger)
+    refcount = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,93 @@
+import os
+from uuid import uuid4
+
+from fastapi import Depends
+from sqlalchemy import update, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database.database import get_session
+from app.videos.streaming import run_io
+from .backends import StorageBackend, get_storage
+from .models import BlobModel
+
+
+class BlobService:
+    """
+    Content-addressed media storage
+
+    Files are stored once per SHA-256 and reference counted, the counter
+    changes in the caller's transaction so it commits together with the
+    rows that reference the blob, and unreferenced files are purged after it
+    """
+
+    def __init__(
+            self,
+            session: AsyncSession = Depends(get_session),
+            storage: StorageBackend = Depends(get_storage)
+    ):
+        self.session = session
+        self.storage = storage
+
+    @staticmethod
+    def staged_path(name: str) -> str:
+        """Local path of a file staged under the upload directory, which is outside the storage"""
+        return os.path.join(settings.upload_dir, name)
+
+    @classmethod
+    def temp_path(cls) -> str:
+        return cls.staged_path(f"{uuid4().hex}.part")
+
+    @staticmethod
+    def blob_key(file_hash: str) -> str:
+        return f"blobs/{file_hash[:2]}/{file_hash}.mp4"
+
+    async def acquire(self, temp_path: str, file_hash: str, size: int) -> str:
+        key = self.blob_key(file_hash)
+        await self.session.execute(
+            insert(BlobModel)
+            .values(hash=file_hash, file=key, size=size, refcount=1)
+            .on_conflict_do_update(
+                index_elements=[BlobModel.hash],
+                set_={"refcount": BlobModel.refcount + 1}
+            )
+        )
+        # The blob row is locked now, so a concurrent release can't delete the object under us
+        if await self.storage.exists(key):
+            await run_io(self.remove_file, temp_path)
+        else:
+            await self.storage.put_file(key, temp_path)
+        return key
+
+    async def release(self, file_hash: str):
+        await self.session.execute(
+            update(BlobModel)
+            .where(BlobModel.hash == file_hash)
+            .values(refcount=BlobModel.refcount - 1)
+        )
+
+    async def purge(self, file_hash: str):
+        """
+        Remove a blob nobody references anymore
+
+        Called after the release has committed, so a rolled back release never
+        loses the file. The row is deleted first and locks out a concurrent acquire
+        until the object is gone
+        """
+        result = await self.session.execute(
+            delete(BlobModel)
+            .where(BlobModel.hash == file_hash, BlobModel.refcount <= 0)
+        )
+        if result.rowcount:
+            try:
+                await self.storage.delete(self.blob_key(file_hash))
+            except OSError:
+                await self.session.rollback()
+                raise
+        await self.session.commit()
+
+    @staticmethod
+    def remove_file(file_path: str):
+        if os.path.exists(file_path):
+            os.remove(file_path)
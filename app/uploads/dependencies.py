@@ -0,0 +1,25 @@
+from fastapi import Depends, HTTPException, status
+
+from app.auth.dependencies import get_current_user
+from app.users.schemas import UserSchema
+from .models import UploadModel
+from .services import UploadService
+
+
+async def valid_owned_upload(
+        upload_id: str,
+        service: UploadService = Depends(),
+        user: UserSchema = Depends(get_current_user)
+) -> UploadModel:
+    upload = await service.get(upload_id)
+    if not upload:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload doesn't exist"
+        )
+    if upload.author_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Don't have permission"
+        )
+    return upload
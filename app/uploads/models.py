@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, TIMESTAMP
+
+from app.database.database import Base
+
+
+class UploadModel(Base):
+    __tablename__ = "uploads"
+
+    id = Column(String(32), primary_key=True)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    title = Column(String(50))
+    description = Column(String(500))
+    file = Column(String(1000))
+    length = Column(BigInteger)
+    offset = Column(BigInteger, default=0)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=True)
+    created_at = Column(TIMESTAMP)
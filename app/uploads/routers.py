@@ -0,0 +1,179 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Response
+from fastapi.requests import Request
+
+from app.auth.dependencies import get_current_user
+from app.exceptions_schemas import MessageSchema
+from app.users.schemas import UserSchema
+from .dependencies import valid_owned_upload
+from .models import UploadModel
+from .schemas import UploadCreateSchema, UploadSchema
+from .services import UploadService
+
+router = APIRouter(
+    prefix="/videos/uploads",
+    tags=["uploads"]
+)
+
+
+@router.post(
+    "",
+    response_model=UploadSchema,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        status.HTTP_201_CREATED: {
+            "model": UploadSchema,
+            "description": "Upload session created"
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "model": MessageSchema,
+            "description": "Could not validate credentials"
+        }
+    }
+)
+async def create_upload(
+        response: Response,
+        upload_data: UploadCreateSchema,
+        service: UploadService = Depends(),
+        user: UserSchema = Depends(get_current_user)
+):
+    """
+    Create a resumable upload session
+
+    **upload_data**: video title, description and file length in bytes
+    """
+    upload = await service.create(upload_data, user)
+    response.headers.update({
+        "Location": f"{router.prefix}/{upload.id}",
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length)
+    })
+    return upload
+
+
+@router.head(
+    "/{upload_id}",
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Current offset in the Upload-Offset header"
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "model": MessageSchema,
+            "description": "Could not validate credentials"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "model": MessageSchema,
+            "description": "Don't have permission"
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": MessageSchema,
+            "description": "Upload doesn't exist"
+        }
+    }
+)
+async def get_upload_offset(
+        upload: UploadModel = Depends(valid_owned_upload)
+):
+    """
+    Get the number of bytes received so far
+
+    **upload_id**: upload id
+    """
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            "Upload-Offset": str(upload.offset),
+            "Upload-Length": str(upload.length),
+            "Cache-Control": "no-store"
+        }
+    )
+
+
+@router.patch(
+    "/{upload_id}",
+    response_model=UploadSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": UploadSchema,
+            "description": "Chunk received, video becomes ready once the upload is complete"
+        },
+        status.HTTP_401_UNAUTHORIZED: {
+            "model": MessageSchema,
+            "description": "Could not validate credentials"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "model": MessageSchema,
+            "description": "Don't have permission"
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": MessageSchema,
+            "description": "Upload doesn't exist"
+        },
+        status.HTTP_409_CONFLICT: {
+            "model": MessageSchema,
+            "description": "Upload offset doesn't match or another request is writing the upload"
+        },
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {
+            "model": MessageSchema,
+            "description": "Upload exceeds declared length"
+        },
+        status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {
+            "model": MessageSchema,
+            "description": "Content type must be application/offset+octet-stream"
+        }
+    }
+)
+async def upload_chunk(
+        request: Request,
+        response: Response,
+        upload_offset: int = Header(...),
+        upload: UploadModel = Depends(valid_owned_upload),
+        service: UploadService = Depends()
+):
+    """
+    Append a chunk to the upload
+
+    **upload_id**: upload id\n
+    **Upload-Offset**: offset of the chunk, must match the current offset\n
+    **body**: raw chunk bytes
+    """
+    if request.headers.get("content-type") != "application/offset+octet-stream":
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content type must be application/offset+octet-stream"
+        )
+    upload = await service.append(request, upload, upload_offset)
+    response.headers["Upload-Offset"] = str(upload.offset)
+    return upload
+
+
+@router.delete(
+    "/{upload_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        status.HTTP_401_UNAUTHORIZED: {
+            "model": MessageSchema,
+            "description": "Could not validate credentials"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "model": MessageSchema,
+            "description": "Don't have permission"
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": MessageSchema,
+            "description": "Upload doesn't exist"
+        }
+    }
+)
+async def delete_upload(
+        upload: UploadModel = Depends(valid_owned_upload),
+        service: UploadService = Depends()
+):
+    """
+    Abort an upload and remove the received bytes
+
+    **upload_id**: upload id
+    """
+    await service.delete(upload)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
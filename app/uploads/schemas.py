@@ -0,0 +1,19 @@
+import datetime
+from pydantic import Field
+
+from app.videos.schemas import BaseVideoSchema
+
+
+class UploadCreateSchema(BaseVideoSchema):
+    length: int = Field(..., gt=0)
+
+
+class UploadSchema(BaseVideoSchema):
+    id: str
+    length: int
+    offset: int
+    video_id: int
+    created_at: datetime.datetime
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,207 @@
+import hashlib
+import os
+from datetime import datetime
+from typing import IO
+from uuid import uuid4
+
+from fastapi import Depends, HTTPException, status
+from fastapi.requests import Request
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.cache.services import get_cache
+from app.config import settings
+from app.database.database import get_session
+from app.feed.services import FeedService
+from app.storage.backends import StorageBackend, get_storage
+from app.storage.services import BlobService
+from app.users.schemas import UserSchema
+from app.videos.models import VideoModel, VideoStatus
+from app.videos.streaming import run_io
+from .models import UploadModel
+from .schemas import UploadCreateSchema
+
+
+class UploadService:
+    def __init__(
+            self,
+            session: AsyncSession = Depends(get_session),
+            storage: StorageBackend = Depends(get_storage)
+    ):
+        self.session = session
+        self.blobs = BlobService(session, storage)
+        self.feed = FeedService(session)
+        self.cache = get_cache()
+
+    async def get(self, upload_id: str) -> UploadModel | None:
+        upload = await self.session.execute(
+            select(UploadModel)
+            .where(UploadModel.id == upload_id)
+        )
+        upload = upload.scalar()
+        if not upload:
+            return
+        return upload
+
+    async def create(self, upload_data: UploadCreateSchema, user: UserSchema) -> UploadModel:
+        upload_id = uuid4().hex
+        # The video gets a storage key once finalized, until then only the upload knows the staged file
+        file_name = f"{upload_id}.part"
+        await run_io(self.create_file, self.blobs.staged_path(file_name))
+
+        video = VideoModel(
+            title=upload_data.title,
+            description=upload_data.description,
+            author_id=user.id,
+            status=VideoStatus.uploading,
+            created_at=datetime.now()
+        )
+        self.session.add(video)
+        await self.session.flush()
+
+        upload = UploadModel(
+            id=upload_id,
+            author_id=user.id,
+            title=upload_data.title,
+            description=upload_data.description,
+            file=file_name,
+            length=upload_data.length,
+            offset=0,
+            video_id=video.id,
+            created_at=video.created_at
+        )
+        self.session.add(upload)
+        await self.session.commit()
+        await self.cache.invalidate(f"user:{user.id}:videos:")
+        return upload
+
+    async def append(self, request: Request, upload: UploadModel, offset: int) -> UploadModel:
+        # The row stays locked until the new offset commits, so a concurrent
+        # request with the same offset can't write into the file meanwhile
+        try:
+            await self.session.execute(
+                select(UploadModel)
+                .where(UploadModel.id == upload.id)
+                .with_for_update(nowait=True)
+                .execution_options(populate_existing=True)
+            )
+        except DBAPIError:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload is being written by another request"
+            )
+        if upload.offset == upload.length or offset != upload.offset:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload offset doesn't match"
+            )
+        file_path, length = self.blobs.staged_path(upload.file), upload.length
+
+        file = await run_io(open, file_path, "r+b")
+        buffer = bytearray()
+        written = 0
+        try:
+            async for chunk in request.stream():
+                if offset + written + len(buffer) + len(chunk) > length:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail="Upload exceeds declared length"
+                    )
+                buffer += chunk
+                if len(buffer) >= settings.upload_buffer_size:
+                    written += await run_io(self.write_at, file, offset + written, buffer)
+                    buffer = bytearray()
+        finally:
+            written += await run_io(self.write_at, file, offset + written, buffer)
+            await run_io(file.close)
+            saved = await self._save_offset(upload.id, offset, offset + written)
+
+        if not saved:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Upload offset doesn't match"
+            )
+        if offset + written == length:
+            await self._finalize(upload)
+        return upload
+
+    async def delete(self, upload: UploadModel):
+        file_path = self.blobs.staged_path(upload.file)
+        if upload.offset < upload.length:
+            # Removing the unfinished video cascades to the upload
+            await self.session.execute(
+                delete(VideoModel)
+                .where(VideoModel.id == upload.video_id)
+            )
+            self.session.expunge(upload)
+        else:
+            await self.session.delete(upload)
+        await self.session.commit()
+        await self.cache.invalidate(f"video:{upload.video_id}:", f"user:{upload.author_id}:videos:")
+        # A finalized upload's file has moved to storage, one that failed to finalize is still staged
+        await run_io(self.remove_file, file_path)
+
+    async def _save_offset(self, upload_id: str, offset: int, new_offset: int) -> bool:
+        result = await self.session.execute(
+            update(UploadModel)
+            .where(UploadModel.id == upload_id, UploadModel.offset == offset)
+            .values(offset=new_offset)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def _finalize(self, upload: UploadModel):
+        # A rollback expires the upload, and reloading it lazily isn't possible under AsyncSession
+        video_id, author_id = upload.video_id, upload.author_id
+        try:
+            file_path = self.blobs.staged_path(upload.file)
+            file_hash = await run_io(self.hash_file, file_path)
+            values = {
+                "file": await self.blobs.acquire(file_path, file_hash, upload.length),
+                "etag": file_hash,
+                "blob_hash": file_hash,
+                "status": VideoStatus.ready
+            }
+        except OSError:
+            await self.session.rollback()
+            values = {"status": VideoStatus.failed}
+
+        await self.session.execute(
+            update(VideoModel)
+            .where(VideoModel.id == video_id)
+            .values(**values)
+        )
+        if values["status"] == VideoStatus.ready:
+            await self.feed.fan_out(author_id, video_id)
+        await self.session.commit()
+        await self.cache.invalidate(f"video:{video_id}:", f"user:{author_id}:videos:")
+        if values["status"] == VideoStatus.failed:
+            await self.session.refresh(upload)
+
+    @staticmethod
+    def create_file(file_path: str):
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        open(file_path, "wb").close()
+
+    @staticmethod
+    def remove_file(file_path: str):
+        if os.path.exists(file_path):
+            os.remove(file_path)
+
+    @staticmethod
+    def write_at(file: IO[bytes], offset: int, data: bytearray) -> int:
+        if data:
+            file.seek(offset)
+            file.write(data)
+        return len(data)
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        file_hash = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                file_hash.update(chunk)
+        return file_hash.hexdigest()
@@ -1,12 +1,13 @@
 from fastapi import Depends, HTTPException, status
 
 from .models import UserModel
+from .schemas import UserInfoSchema
 from app.users.services import UserService
 
 
 async def valid_user_id(
         user_id: int,
-        service: UserService = Depends()
+        service: UserService = Depends(UserService.reader)
 ) -> UserModel:
     user = await service.get(user_id)
     if not user:
@@ -15,3 +16,17 @@ async def valid_user_id(
             detail="User doesn't exist"
         )
     return user
+
+
+async def valid_cached_user(
+        user_id: int,
+        service: UserService = Depends(UserService.reader)
+) -> UserInfoSchema:
+    """Existence check for read-only routes, a cache hit doesn't touch the database"""
+    user = await service.get_info(user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User doesn't exist"
+        )
+    return UserInfoSchema.parse_obj(user)
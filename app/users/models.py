@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Table, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.database.database import Base
@@ -7,7 +7,8 @@ subscribers_table = Table(
     "subscribers",
     Base.metadata,
     Column("author_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
-    Column("subscriber_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    Column("subscriber_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_subscribers_subscriber_id_author_id", "subscriber_id", "author_id")
 )
 
 
@@ -19,6 +20,7 @@ class UserModel(Base):
     username = Column(String(50))
     bio = Column(String(160), nullable=True)
     password = Column(String)
+    subscribers_count = Column(Integer, default=0, server_default="0", nullable=False)
     subscribers = relationship(
         "UserModel",
         secondary="subscribers",
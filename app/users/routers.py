@@ -2,9 +2,10 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 
-from app.users.dependencies import valid_user_id
+from app.users.dependencies import valid_user_id, valid_cached_user
 from .models import UserModel
 from app.exceptions_schemas import MessageSchema
+from app.pagination import Pagination
 from app.users.schemas import UserSchema, UserUpdateSchema, UserInfoSchema
 from app.videos.schemas import SimpleVideoSchema
 from app.auth.dependencies import get_current_user
@@ -32,7 +33,7 @@ router = APIRouter(
     }
 )
 async def get_user_info(
-        user: UserModel = Depends(valid_user_id)
+        user: UserInfoSchema = Depends(valid_cached_user)
 ):
     """
     Get user info
@@ -51,6 +52,10 @@ async def get_user_info(
             "model": List[SimpleVideoSchema],
             "description": "Received list of user's videos"
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "User doesn't exist"
@@ -58,15 +63,18 @@ async def get_user_info(
     }
 )
 async def get_user_videos(
-        user: UserModel = Depends(valid_user_id),
-        service: UserService = Depends()
+        user: UserInfoSchema = Depends(valid_cached_user),
+        service: UserService = Depends(UserService.reader),
+        page: Pagination = Depends()
 ):
     """
     Get user videos
 
-    **user_id**: user id
+    **user_id**: user id\n
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: page size, up to 100
     """
-    return await service.get_videos(user.id)
+    return page.paginate(await service.get_videos(user.id, page), key=lambda video: video["id"])
 
 
 @router.patch(
@@ -121,6 +129,10 @@ async def update_user_info(
             "model": UserSchema,
             "description": "Received list of user's subscriptions"
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "User doesn't exist"
@@ -128,14 +140,18 @@ async def update_user_info(
     }
 )
 async def get_user_subscriptions(
-        user: UserModel = Depends(valid_user_id)
+        user: UserInfoSchema = Depends(valid_cached_user),
+        service: UserService = Depends(UserService.reader),
+        page: Pagination = Depends()
 ):
     """
     Get user subscriptions
 
-    **user_id**: user id
+    **user_id**: user id\n
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: page size, up to 100
     """
-    return user.subscribe_to
+    return page.paginate(await service.get_subscriptions(user.id, page), key=lambda author: author["id"])
 
 
 @router.get(
@@ -147,6 +163,10 @@ async def get_user_subscriptions(
             "model": UserSchema,
             "description": "Received list of user's subscribers"
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "User doesn't exist"
@@ -154,14 +174,18 @@ async def get_user_subscriptions(
     }
 )
 async def get_user_subscribers(
-        user: UserModel = Depends(valid_user_id)
+        user: UserInfoSchema = Depends(valid_cached_user),
+        service: UserService = Depends(UserService.reader),
+        page: Pagination = Depends()
 ):
     """
     Get users subscribers
 
-    **user_id**: user id
+    **user_id**: user id\n
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: page size, up to 100
     """
-    return user.subscribers
+    return page.paginate(await service.get_subscribers(user.id, page), key=lambda subscriber: subscriber["id"])
 
 
 @router.put(
@@ -1,6 +1,7 @@
-from typing import Optional, List
+from typing import Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel
+from pydantic.utils import GetterDict
 
 
 class BaseUserSchema(BaseModel):
@@ -19,13 +20,19 @@ class UserSchema(BaseUserSchema):
         orm_mode = True
 
 
+class UserInfoGetter(GetterDict):
+    def get(self, key, default=None):
+        if key == "subscribers":
+            return getattr(self._obj, "subscribers_count", default)
+        return super().get(key, default)
+
+
 class UserInfoSchema(UserSchema):
     bio: Optional[str]
-    subscribers: List[UserSchema]
+    subscribers: int = 0
 
-    @validator("subscribers")
-    def get_amount(cls, lst):
-        return len(lst)
+    class Config:
+        getter_dict = UserInfoGetter
 
 
 class UserUpdateSchema(BaseModel):
@@ -1,29 +1,40 @@
 from typing import List
 
 from fastapi import Depends
-from sqlalchemy import select, insert, delete, and_
+from sqlalchemy import select, delete, update, and_, bindparam
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
 
+from app.cache.services import get_cache
 from app.database.database import get_session
+from app.database.identity import get_loaded
+from app.database.replicas import get_read_session
+from app.feed.services import FeedService
+from app.pagination import Pagination
 from .models import UserModel, subscribers_table
 from app.videos.models import VideoModel
-from app.users.schemas import UserUpdateSchema, UserSchema
+from app.users.schemas import UserUpdateSchema, UserSchema, UserInfoSchema
+from app.videos.schemas import SimpleVideoSchema
+
+GET_USER = select(UserModel).where(UserModel.id == bindparam("user_id"))
 
 
 class UserService:
     def __init__(self, session: AsyncSession = Depends(get_session)):
         self.session = session
+        self.feed = FeedService(session)
+        self.cache = get_cache()
+
+    @classmethod
+    def reader(cls, session: AsyncSession = Depends(get_read_session)) -> "UserService":
+        """Service for read-only dependencies, served by a replica on safe requests"""
+        return cls(session)
 
     async def _get(self, user_id: int) -> UserModel | None:
-        user = await self.session.execute(
-            select(UserModel)
-            .options(joinedload(UserModel.videos))
-            .options(joinedload(UserModel.subscribers))
-            .options(joinedload(UserModel.subscribe_to))
-            .options(joinedload(UserModel.comments))
-            .where(UserModel.id == user_id)
-        )
+        user = get_loaded(self.session, UserModel, user_id)
+        if user:
+            return user
+        user = await self.session.execute(GET_USER, {"user_id": user_id})
         user = user.scalar()
         if not user:
             return
@@ -35,22 +46,43 @@ class UserService:
             return
         return user
 
-    async def get_videos(self, user_id: int) -> List[VideoModel]:
-        videos = await self.session.execute(
-            select(VideoModel)
-            .where(VideoModel.author_id == user_id)
-        )
-        videos = videos.scalars().all()
-        return videos
-
-    async def get_subscribers(self, user_id: int) -> List[int]:
-        user = await self.session.execute(
-            select(UserModel)
-            .options(joinedload(UserModel.subscribers))
-            .where(UserModel.id == user_id)
-        )
-        user = user.scalar()
-        return [subscriber.id for subscriber in user.subscribers]
+    async def get_info(self, user_id: int) -> dict | None:
+        async def load():
+            user = await self._get(user_id)
+            return UserInfoSchema.from_orm(user) if user else None
+        return await self.cache.get_or_load(f"user:{user_id}:info", load)
+
+    async def get_videos(self, user_id: int, page: Pagination) -> List[dict]:
+        async def load():
+            videos = await self.session.execute(page.apply(
+                select(VideoModel)
+                .where(VideoModel.author_id == user_id),
+                VideoModel.id
+            ))
+            return [SimpleVideoSchema.from_orm(video) for video in videos.scalars()]
+        return await self.cache.get_or_load(f"user:{user_id}:videos:{page.cache_key}", load)
+
+    async def get_subscribers(self, user_id: int, page: Pagination) -> List[dict]:
+        async def load():
+            users = await self.session.execute(page.apply(
+                select(UserModel)
+                .join(subscribers_table, subscribers_table.c.subscriber_id == UserModel.id)
+                .where(subscribers_table.c.author_id == user_id),
+                subscribers_table.c.subscriber_id
+            ))
+            return [UserSchema.from_orm(user) for user in users.scalars()]
+        return await self.cache.get_or_load(f"user:{user_id}:subscribers:{page.cache_key}", load)
+
+    async def get_subscriptions(self, user_id: int, page: Pagination) -> List[dict]:
+        async def load():
+            users = await self.session.execute(page.apply(
+                select(UserModel)
+                .join(subscribers_table, subscribers_table.c.author_id == UserModel.id)
+                .where(subscribers_table.c.subscriber_id == user_id),
+                subscribers_table.c.author_id
+            ))
+            return [UserSchema.from_orm(user) for user in users.scalars()]
+        return await self.cache.get_or_load(f"user:{user_id}:subscriptions:{page.cache_key}", load)
 
     async def update(self, user_id: int, user_data: UserUpdateSchema) -> UserModel:
         user = await self._get(user_id)
@@ -58,23 +90,50 @@ class UserService:
             if value is not None:
                 setattr(user, field, value)
         await self.session.commit()
+        await self.cache.invalidate(f"user:{user_id}:")
         return user
 
-    async def subscribe(self, author_id: int, user: UserSchema):
-        if user.id not in await self.get_subscribers(author_id):
-            await self.session.execute(
-                insert(subscribers_table)
-                .values(author_id=author_id, subscriber_id=user.id)
-            )
-            await self.session.commit()
-
-    async def unsubscribe(self, author_id: int, user: UserSchema):
-        if user.id in await self.get_subscribers(author_id):
-            await self.session.execute(
-                delete(subscribers_table)
-                .where(and_(
-                    subscribers_table.c.subscriber_id == user.id,
-                    subscribers_table.c.author_id == author_id)
-                )
+    async def subscribe(self, author_id: int, user: UserSchema) -> bool:
+        result = await self.session.execute(
+            insert(subscribers_table)
+            .values(author_id=author_id, subscriber_id=user.id)
+            .on_conflict_do_nothing()
+        )
+        if result.rowcount:
+            await self._add_subscribers(author_id, 1)
+            await self.feed.follow(user.id, author_id)
+        await self.session.commit()
+        if result.rowcount:
+            await self._invalidate_subscription(author_id, user.id)
+        return result.rowcount == 1
+
+    async def unsubscribe(self, author_id: int, user: UserSchema) -> bool:
+        result = await self.session.execute(
+            delete(subscribers_table)
+            .where(and_(
+                subscribers_table.c.subscriber_id == user.id,
+                subscribers_table.c.author_id == author_id)
             )
-            await self.session.commit()
+        )
+        if result.rowcount:
+            await self._add_subscribers(author_id, -1)
+            await self.feed.unfollow(user.id, author_id)
+            await self.feed.backfill_subscribers(author_id)
+        await self.session.commit()
+        if result.rowcount:
+            await self._invalidate_subscription(author_id, user.id)
+        return result.rowcount == 1
+
+    async def _add_subscribers(self, author_id: int, amount: int):
+        await self.session.execute(
+            update(UserModel)
+            .where(UserModel.id == author_id)
+            .values(subscribers_count=UserModel.subscribers_count + amount)
+        )
+
+    async def _invalidate_subscription(self, author_id: int, subscriber_id: int):
+        await self.cache.invalidate(
+            f"user:{author_id}:info",
+            f"user:{author_id}:subscribers:",
+            f"user:{subscriber_id}:subscriptions:"
+        )
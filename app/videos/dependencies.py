@@ -2,13 +2,14 @@ from fastapi import Depends, HTTPException, status
 
 from app.auth.dependencies import get_current_user
 from app.users.schemas import UserSchema
-from .models import VideoModel
+from .models import VideoModel, VideoStatus
+from .schemas import VideoStatusSchema
 from .services import VideoService
 
 
 async def valid_video_id(
         video_id: int,
-        service: VideoService = Depends()
+        service: VideoService = Depends(VideoService.reader)
 ) -> VideoModel:
     video = await service.get(video_id)
     if not video:
@@ -19,11 +20,44 @@ async def valid_video_id(
     return video
 
 
+async def valid_cached_video(
+        video_id: int,
+        service: VideoService = Depends(VideoService.reader)
+) -> VideoStatusSchema:
+    """Existence check for read-only routes, a cache hit doesn't touch the database"""
+    video = await service.get_status(video_id)
+    if not video:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video doesn't exist"
+        )
+    return VideoStatusSchema.parse_obj(video)
+
+
+async def valid_ready_video(
+        video: VideoModel = Depends(valid_video_id)
+) -> VideoModel:
+    if video.status == VideoStatus.uploading:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Video is still uploading",
+            headers={
+                "Retry-After": "5"
+            }
+        )
+    if video.status == VideoStatus.failed:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Video processing failed"
+        )
+    return video
+
+
 async def valid_owned_video(
         video: VideoModel = Depends(valid_video_id),
         user: UserSchema = Depends(get_current_user)
 ) -> VideoModel:
-    if video.author.id != user.id:
+    if video.author_id != user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Don't have permission"
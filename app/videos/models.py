@@ -1,9 +1,17 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, Table
+import enum
+
+from sqlalchemy import Column, Integer, String, ForeignKey, TIMESTAMP, Table, Index
 from sqlalchemy.orm import relationship
 
 from app.database.database import Base
 
 
+class VideoStatus(str, enum.Enum):
+    uploading = "uploading"
+    ready = "ready"
+    failed = "failed"
+
+
 class VideoModel(Base):
     __tablename__ = "videos"
 
@@ -11,8 +19,13 @@ class VideoModel(Base):
     title = Column(String(50))
     description = Column(String(500))
     file = Column(String(1000))
+    etag = Column(String(64), nullable=True)
+    blob_hash = Column(String(64), ForeignKey("blobs.hash"), nullable=True, index=True)
+    status = Column(String(16), default=VideoStatus.ready.value, server_default=VideoStatus.ready.value, nullable=False)
     created_at = Column(TIMESTAMP)
-    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    likes_count = Column(Integer, default=0, server_default="0", nullable=False)
+    comments_count = Column(Integer, default=0, server_default="0", nullable=False)
+    author_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     comments = relationship("CommentModel", cascade="all,delete")
     author = relationship("UserModel", back_populates="videos")
     likes = relationship(
@@ -20,6 +33,10 @@ class VideoModel(Base):
         secondary="videos_likes"
     )
 
+    __table_args__ = (
+        Index("ix_videos_author_id_id", "author_id", "id"),
+    )
+
 
 likes_table = Table(
     "videos_likes",
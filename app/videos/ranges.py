@@ -0,0 +1,147 @@
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Tuple, Mapping
+
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(HTTPException):
+    def __init__(self, file_size: int):
+        super().__init__(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={
+                "Content-Range": f"bytes */{file_size}"
+            }
+        )
+
+
+def parse_range_header(header: str | None, file_size: int) -> List[Tuple[int, int]] | None:
+    """
+    Parse a `Range` header into sorted, coalesced `[start, end)` byte ranges
+
+    Returns None when the header is absent or malformed, in which case the
+    whole representation must be sent, and raises RangeNotSatisfiable when
+    none of the requested ranges overlap the file
+    """
+    if not header:
+        return
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return
+
+    ranges = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or not (first or last):
+            return
+        if not (first or "0").isdigit() or not (last or "0").isdigit():
+            return
+
+        if not first:
+            suffix_length = int(last)
+            if suffix_length == 0:
+                continue
+            ranges.append((max(0, file_size - suffix_length), file_size))
+            continue
+
+        start = int(first)
+        if last and int(last) < start:
+            return
+        if start < file_size:
+            end = int(last) + 1 if last else file_size
+            ranges.append((start, min(end, file_size)))
+
+    if len(ranges) > MAX_RANGES:
+        return
+    if not ranges:
+        raise RangeNotSatisfiable(file_size)
+
+    ranges.sort()
+    coalesced = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = coalesced[-1]
+        if start <= last_end:
+            coalesced[-1] = (last_start, max(last_end, end))
+        else:
+            coalesced.append((start, end))
+    return coalesced
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def etag_matches(if_none_match: str, etag: str | None) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    if etag is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def is_not_modified(headers: Mapping[str, str], etag: str | None, last_modified: float | None) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def if_range_matches(if_range: str | None, etag: str | None, last_modified: float | None) -> bool:
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith("W/"):
+        return False
+    if if_range.startswith('"'):
+        return etag is not None and if_range == etag
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_range).timestamp() == int(last_modified)
+    except (TypeError, ValueError):
+        return False
+
+
+def prepare_ranges(
+        headers: Mapping[str, str],
+        file_size: int,
+        etag: str | None,
+        last_modified: float
+) -> Tuple[int, List[Tuple[int, int]], dict]:
+    """
+    Pick the status code, byte ranges and validator headers for a video response
+    """
+    response_headers = {
+        "Last-Modified": http_date(last_modified),
+        "Cache-Control": settings.video_cache_control
+    }
+    if etag:
+        response_headers["ETag"] = etag
+
+    if is_not_modified(headers, etag, last_modified):
+        return status.HTTP_304_NOT_MODIFIED, [], response_headers
+
+    ranges = None
+    if if_range_matches(headers.get("if-range"), etag, last_modified):
+        ranges = parse_range_header(headers.get("range"), file_size)
+
+    if ranges is None:
+        return status.HTTP_200_OK, [(0, file_size)], response_headers
+
+    if len(ranges) == 1:
+        range_start, range_end = ranges[0]
+        response_headers["Content-Range"] = f"bytes {range_start}-{range_end - 1}/{file_size}"
+    return status.HTTP_206_PARTIAL_CONTENT, ranges, response_headers
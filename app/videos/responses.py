@@ -0,0 +1,120 @@
+import os
+import time
+import typing
+from uuid import uuid4
+
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from .streaming import ChunkSizer, run_io
+
+if typing.TYPE_CHECKING:
+    from app.storage.backends import StorageBackend
+
+
+class RangedFileResponse(Response):
+    """
+    Sends `[start, end)` slices of a stored file, as `multipart/byteranges` when there are several
+
+    For files on local disk uses the ASGI `http.response.pathsend` extension for
+    whole files and `http.response.zerocopysend` (backed by `os.sendfile`) for
+    ranges when the server advertises them, otherwise streams ranged reads from the storage
+    """
+
+    def __init__(
+            self,
+            storage: "StorageBackend",
+            key: str,
+            ranges: typing.List[typing.Tuple[int, int]],
+            file_size: int,
+            status_code: int = 200,
+            headers: typing.Mapping[str, str] | None = None,
+            media_type: str | None = None,
+            method: str | None = None,
+            background: BackgroundTask | None = None
+    ):
+        self.storage = storage
+        self.key = key
+        self.path = storage.local_path(key)
+        self.file_size = file_size
+        self.status_code = status_code
+        self.send_header_only = method is not None and method.upper() == "HEAD"
+        self.background = background
+
+        if len(ranges) == 1:
+            self.media_type = media_type
+            self.parts = [(b"", *ranges[0])]
+            self.epilogue = b""
+        else:
+            boundary = uuid4().hex
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+            self.parts = []
+            for start, end in ranges:
+                delimiter = f"\r\n--{boundary}\r\n" if self.parts else f"--{boundary}\r\n"
+                prefix = (
+                    f"{delimiter}"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end - 1}/{file_size}\r\n\r\n"
+                )
+                self.parts.append((prefix.encode("latin-1"), start, end))
+            self.epilogue = f"\r\n--{boundary}--\r\n".encode("latin-1")
+
+        self.init_headers(headers)
+        self.headers["content-length"] = str(
+            sum(len(prefix) + end - start for prefix, start, end in self.parts) + len(self.epilogue)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers
+        })
+
+        extensions = scope.get("extensions") or {}
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif self.path is None:
+            await self.send_chunked(send)
+        elif "http.response.pathsend" in extensions and self.parts == [(b"", 0, self.file_size)]:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        elif "http.response.zerocopysend" in extensions:
+            await self.send_zerocopy(send)
+        else:
+            await self.send_chunked(send)
+
+        if self.background is not None:
+            await self.background()
+
+    async def send_zerocopy(self, send: Send):
+        file = await run_io(open, self.path, "rb")
+        try:
+            for prefix, start, end in self.parts:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": start,
+                    "count": end - start,
+                    "more_body": True
+                })
+            await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
+        finally:
+            await run_io(file.close)
+
+    async def send_chunked(self, send: Send):
+        for prefix, start, end in self.parts:
+            if prefix:
+                await send({"type": "http.response.body", "body": prefix, "more_body": True})
+            sizer = ChunkSizer(end - start)
+            chunks = self.storage.read_range(self.key, start, end, sizer)
+            try:
+                async for chunk in chunks:
+                    started = time.monotonic()
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+                    sizer.record(len(chunk), time.monotonic() - started)
+            finally:
+                await chunks.aclose()
+        await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
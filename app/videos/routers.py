@@ -1,17 +1,25 @@
+import hashlib
+from datetime import datetime, timezone
 from typing import List
 
-from fastapi import APIRouter, Form, UploadFile, File, Depends, HTTPException, status, BackgroundTasks, Response
-from fastapi.responses import StreamingResponse, HTMLResponse
+from fastapi import APIRouter, Depends, status, Response
+from fastapi.responses import HTMLResponse
 from fastapi.requests import Request
 from fastapi.templating import Jinja2Templates
 
-from app.videos.dependencies import valid_video_id, valid_owned_video
+from app.config import settings
+from app.storage.backends import StorageBackend, get_storage
+from app.videos.dependencies import valid_video_id, valid_cached_video, valid_ready_video, valid_owned_video
 from app.exceptions_schemas import MessageSchema
+from app.pagination import Pagination
 from app.users.schemas import UserSchema
-from app.videos.schemas import VideoCreateSchema, VideoSchema, VideoUpdateSchema
+from app.videos.schemas import StreamTokenSchema, VideoSchema, VideoStatusSchema, VideoUpdateSchema
 from app.auth.dependencies import get_current_user
 from app.videos.services import VideoService
-from .models import VideoModel
+from .models import VideoModel, VideoStatus
+from .ranges import is_not_modified, prepare_ranges
+from .responses import RangedFileResponse
+from .tokens import decode_stream_token, encode_stream_token
 
 
 templates = Jinja2Templates(directory="app/templates")
@@ -39,34 +47,49 @@ router = APIRouter(
             "model": MessageSchema,
             "description": "Video doesn't exist"
         },
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {
+            "model": MessageSchema,
+            "description": "Form field is too large"
+        },
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: {
             "model": MessageSchema,
             "description": "File type must be mp4"
         }
+    },
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["title", "description", "file"],
+                        "properties": {
+                            "title": {"type": "string"},
+                            "description": {"type": "string"},
+                            "file": {"type": "string", "format": "binary"}
+                        }
+                    }
+                }
+            }
+        }
     }
 )
 async def upload_video(
-        background_tasks: BackgroundTasks,
-        title: str = Form(...),
-        description: str = Form(...),
-        file: UploadFile = File(...),
+        request: Request,
         service: VideoService = Depends(),
         user: UserSchema = Depends(get_current_user)
 ):
     """
     Upload a video
 
+    The multipart body is parsed as it arrives and the file is written straight to storage
+
     **title**: video title\n
     **description**: video description\n
     **file**: MP4 file
     """
-    if file.content_type != "video/mp4":
-        raise HTTPException(
-            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            detail="File type must be mp4"
-        )
-    video_data = VideoCreateSchema(title=title, description=description, author=user)
-    return await service.create(background_tasks, file, video_data)
+    return await service.create(request, user)
 
 
 @router.get(
@@ -77,6 +100,9 @@ async def upload_video(
         status.HTTP_200_OK: {
             "description": "Received HTML template"
         },
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Cached template is still valid"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "Video doesn't exist"
@@ -85,6 +111,7 @@ async def upload_video(
 )
 async def get_video(
         request: Request,
+        service: VideoService = Depends(),
         video: VideoModel = Depends(valid_video_id)
 ):
     """
@@ -92,48 +119,199 @@ async def get_video(
 
     **video_id**: video id
     """
-    return templates.TemplateResponse(
-        "videos.html", {"request": request, "video_data": video}
+    if video.status == VideoStatus.ready:
+        token = encode_stream_token(await service.create_stream_token(video))
+        stream_url = request.url_for("get_signed_streaming_video", token=token)
+    else:
+        stream_url = request.url_for("get_streaming_video", video_id=video.id)
+    response = templates.TemplateResponse(
+        "videos.html", {"request": request, "video_data": video, "stream_url": stream_url}
     )
+    headers = {
+        "ETag": f'W/"{hashlib.sha1(response.body).hexdigest()}"',
+        "Cache-Control": settings.page_cache_control
+    }
+    if is_not_modified(request.headers, headers["ETag"], None):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return response
 
 
 @router.get(
     "/{video_id}/watching",
-    response_class=StreamingResponse,
+    response_class=RangedFileResponse,
     status_code=status.HTTP_200_OK,
     responses={
         status.HTTP_200_OK: {
             "description": "Watching video"
         },
+        status.HTTP_206_PARTIAL_CONTENT: {
+            "description": "Requested ranges of video"
+        },
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Cached video is still valid"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "Video doesn't exist"
+        },
+        status.HTTP_409_CONFLICT: {
+            "model": MessageSchema,
+            "description": "Video is still uploading or its processing failed"
+        },
+        status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE: {
+            "model": MessageSchema,
+            "description": "Requested range not satisfiable"
         }
     }
 )
 async def get_streaming_video(
         request: Request,
-        service: VideoService = Depends(),
-        video: VideoModel = Depends(valid_video_id)
-) -> StreamingResponse:
+        service: VideoService = Depends(VideoService.reader),
+        video: VideoModel = Depends(valid_ready_video)
+) -> RangedFileResponse:
     """
     Get streaming video for watching
 
     **video_id**: video id
     """
-    file, status_code, content_length, headers = await service.open_file(request, video.id)
-    response = StreamingResponse(
-        file,
+    key, status_code, ranges, file_size, headers = await service.open_file(request, video)
+    # Yield dependencies are closed after the body is sent, which may take hours
+    await service.release()
+    if status_code == status.HTTP_304_NOT_MODIFIED:
+        return Response(status_code=status_code, headers=headers)
+    return RangedFileResponse(
+        service.storage,
+        key,
+        ranges=ranges,
+        file_size=file_size,
+        status_code=status_code,
+        headers={
+            "Accept-Ranges": "bytes",
+            **headers
+        },
         media_type="video/mp4",
-        status_code=status_code
+        method=request.method
     )
 
-    response.headers.update({
-        "Accept-Ranges": "bytes",
-        "Content-Length": str(content_length),
-        **headers
-    })
-    return response
+
+@router.post(
+    "/{video_id}/stream-token",
+    response_model=StreamTokenSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": StreamTokenSchema,
+            "description": "Received signed streaming url"
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": MessageSchema,
+            "description": "Video doesn't exist"
+        },
+        status.HTTP_409_CONFLICT: {
+            "model": MessageSchema,
+            "description": "Video is still uploading or its processing failed"
+        }
+    }
+)
+async def create_stream_token(
+        request: Request,
+        service: VideoService = Depends(),
+        video: VideoModel = Depends(valid_ready_video)
+):
+    """
+    Get signed, time-limited url for streaming video without database lookups
+
+    **video_id**: video id
+    """
+    payload = await service.create_stream_token(video)
+    token = encode_stream_token(payload)
+    return StreamTokenSchema(
+        token=token,
+        url=request.url_for("get_signed_streaming_video", token=token),
+        expires_at=datetime.fromtimestamp(payload.exp, timezone.utc)
+    )
+
+
+@router.get(
+    "/stream/{token}",
+    response_class=RangedFileResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "description": "Watching video"
+        },
+        status.HTTP_206_PARTIAL_CONTENT: {
+            "description": "Requested ranges of video"
+        },
+        status.HTTP_304_NOT_MODIFIED: {
+            "description": "Cached video is still valid"
+        },
+        status.HTTP_403_FORBIDDEN: {
+            "model": MessageSchema,
+            "description": "Invalid or expired stream token"
+        },
+        status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE: {
+            "model": MessageSchema,
+            "description": "Requested range not satisfiable"
+        }
+    }
+)
+async def get_signed_streaming_video(
+        request: Request,
+        token: str,
+        storage: StorageBackend = Depends(get_storage)
+) -> RangedFileResponse:
+    """
+    Get streaming video by signed token
+
+    **token**: token from stream-token endpoint
+    """
+    payload = decode_stream_token(token)
+    status_code, ranges, headers = prepare_ranges(request.headers, payload.size, payload.etag, payload.mtime)
+    if status_code == status.HTTP_304_NOT_MODIFIED:
+        return Response(status_code=status_code, headers=headers)
+    return RangedFileResponse(
+        storage,
+        payload.key,
+        ranges=ranges,
+        file_size=payload.size,
+        status_code=status_code,
+        headers={
+            "Accept-Ranges": "bytes",
+            **headers
+        },
+        media_type="video/mp4",
+        method=request.method
+    )
+
+
+@router.get(
+    "/{video_id}/status",
+    response_model=VideoStatusSchema,
+    status_code=status.HTTP_200_OK,
+    responses={
+        status.HTTP_200_OK: {
+            "model": VideoStatusSchema,
+            "description": "Received video processing status"
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "model": MessageSchema,
+            "description": "Video doesn't exist"
+        }
+    }
+)
+async def get_video_status(
+        response: Response,
+        video: VideoModel = Depends(valid_video_id)
+):
+    """
+    Get video processing status: uploading, ready or failed
+
+    **video_id**: video id
+    """
+    response.headers["Cache-Control"] = "no-store"
+    return video
 
 
 @router.patch(
@@ -170,7 +348,7 @@ async def update_video(
     **video_id**: video id\n
     **video_data**: video title and description
     """
-    return await service.update(video.id, video_data)
+    return await service.update(video, video_data)
 
 
 @router.delete(
@@ -200,7 +378,7 @@ async def delete_video(
 
     **video_id**: video id
     """
-    await service.delete(video.id)
+    await service.delete(video)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -213,6 +391,10 @@ async def delete_video(
             "model": List[UserSchema],
             "description": "Received list of users"
         },
+        status.HTTP_400_BAD_REQUEST: {
+            "model": MessageSchema,
+            "description": "Invalid cursor"
+        },
         status.HTTP_404_NOT_FOUND: {
             "model": MessageSchema,
             "description": "Video doesn't exist"
@@ -220,14 +402,18 @@ async def delete_video(
     }
 )
 async def get_video_likes(
-        video: VideoModel = Depends(valid_video_id)
+        video: VideoStatusSchema = Depends(valid_cached_video),
+        service: VideoService = Depends(VideoService.reader),
+        page: Pagination = Depends()
 ):
     """
     Get a list of users who liked the video
 
-    **video_id**: video id
+    **video_id**: video id\n
+    **cursor**: cursor of the next page from the X-Next-Cursor header\n
+    **limit**: page size, up to 100
     """
-    return video.likes
+    return page.paginate(await service.get_likes(video.id, page), key=lambda user: user["id"])
 
 
 @router.put(
@@ -258,8 +444,7 @@ async def like_video(
 
     **video_id**: video id
     """
-    if user.id not in await service.get_like_list(video.id):
-        await service.like(video.id, user.id)
+    await service.like(video.id, user.id)
     return Response(status_code=status.HTTP_200_OK)
 
 
@@ -291,6 +476,5 @@ async def unlike_video(
 
     **video_id**: video id
     """
-    if user.id in await service.get_like_list(video.id):
-        await service.unlike(video.id, user.id)
+    await service.unlike(video.id, user.id)
     return Response(status_code=status.HTTP_200_OK)
@@ -1,10 +1,12 @@
 import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel
+from pydantic.utils import GetterDict
 
 from app.users.schemas import UserSchema
 from app.comments.schemas import CommentSchema
+from .models import VideoStatus
 
 
 class BaseVideoSchema(BaseModel):
@@ -15,25 +17,47 @@ class BaseVideoSchema(BaseModel):
 class SimpleVideoSchema(BaseVideoSchema):
     id: int
     created_at: datetime.datetime
+    status: VideoStatus = VideoStatus.ready
 
     class Config:
         orm_mode = True
 
 
+class VideoGetter(GetterDict):
+    def get(self, key, default=None):
+        if key == "likes":
+            return getattr(self._obj, "likes_count", default)
+        return super().get(key, default)
+
+
 class VideoSchema(SimpleVideoSchema):
     comments: List[CommentSchema] = []
+    comments_count: int = 0
     author: UserSchema
-    likes: List[UserSchema] = []
+    likes: int = 0
 
-    @validator("likes")
-    def get_amount(cls, lst):
-        return len(lst)
+    class Config:
+        getter_dict = VideoGetter
 
 
 class VideoCreateSchema(BaseVideoSchema):
     author: UserSchema
 
 
+class VideoStatusSchema(BaseModel):
+    id: int
+    status: VideoStatus
+
+    class Config:
+        orm_mode = True
+
+
+class StreamTokenSchema(BaseModel):
+    token: str
+    url: str
+    expires_at: datetime.datetime
+
+
 class VideoUpdateSchema(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
@@ -1,160 +1,237 @@
-import os
-import shutil
+import enum
 from datetime import datetime
-from os import makedirs
-from pathlib import Path
-from uuid import uuid4
-from typing import IO, Generator, List
+from typing import List
 
-from fastapi import UploadFile, Depends
-from sqlalchemy import select, delete, and_, insert
+from fastapi import Depends
+from sqlalchemy import select, delete, update, bindparam
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload
-from fastapi.background import BackgroundTasks
+from sqlalchemy.orm import joinedload, selectinload
 from fastapi.requests import Request
 
+from app.cache.services import get_cache
+from app.comments.models import CommentModel
 from app.database.database import get_session
-from .models import VideoModel, likes_table
-from .schemas import VideoCreateSchema, VideoSchema, VideoUpdateSchema
+from app.database.identity import get_loaded
+from app.database.replicas import get_read_session
+from app.feed.services import FeedService
+from app.pagination import Pagination
+from app.storage.backends import StorageBackend, get_storage
+from app.storage.services import BlobService
+from app.uploads.models import UploadModel
+from app.users.models import UserModel
+from app.users.schemas import UserSchema
+from .models import VideoModel, VideoStatus, likes_table
+from .ranges import prepare_ranges
+from .tokens import StreamTokenPayload, create_stream_token
+from .schemas import VideoCreateSchema, VideoSchema, VideoUpdateSchema, VideoStatusSchema
+from .streaming import run_io
+from .uploads import UploadParser
+
+
+class LoadPlan(enum.Enum):
+    bare = "bare"
+    author = "author"
+    full = "full"
+
+
+LOAD_OPTIONS = {
+    LoadPlan.bare: (),
+    LoadPlan.author: (
+        joinedload(VideoModel.author),
+    ),
+    # Likes are rendered from likes_count, comments are fetched with a separate IN query
+    LoadPlan.full: (
+        joinedload(VideoModel.author),
+        selectinload(VideoModel.comments).joinedload(CommentModel.author)
+    )
+}
+
+# Relationships each plan loads, an entity already in the session is reused only if it has them
+LOAD_RELATIONSHIPS = {
+    LoadPlan.bare: (),
+    LoadPlan.author: ("author",),
+    LoadPlan.full: ("author", "comments")
+}
+
+# Hot statements are built once, SQLAlchemy and asyncpg then reuse their compiled
+# and prepared forms instead of rebuilding them on every request
+GET_VIDEO = {
+    plan: select(VideoModel).options(*options).where(VideoModel.id == bindparam("video_id"))
+    for plan, options in LOAD_OPTIONS.items()
+}
+LIKE_VIDEO = (
+    insert(likes_table)
+    .values(video_id=bindparam("video_id"), user_id=bindparam("user_id"))
+    .on_conflict_do_nothing()
+)
+UNLIKE_VIDEO = (
+    delete(likes_table)
+    .where(likes_table.c.video_id == bindparam("video_id"), likes_table.c.user_id == bindparam("user_id"))
+)
 
 
 class VideoService:
-    def __init__(self, session: AsyncSession = Depends(get_session)):
+    def __init__(
+            self,
+            session: AsyncSession = Depends(get_session),
+            storage: StorageBackend = Depends(get_storage)
+    ):
         self.session = session
-
-    async def _get(self, video_id: int) -> VideoModel | None:
-        video = await self.session.execute(
-            select(VideoModel)
-            .options(joinedload(VideoModel.author))
-            .options(joinedload(VideoModel.comments))
-            .options(joinedload(VideoModel.likes))
-            .where(VideoModel.id == video_id)
-        )
+        self.storage = storage
+        self.blobs = BlobService(session, storage)
+        self.feed = FeedService(session)
+        self.cache = get_cache()
+
+    @classmethod
+    def reader(
+            cls,
+            session: AsyncSession = Depends(get_read_session),
+            storage: StorageBackend = Depends(get_storage)
+    ) -> "VideoService":
+        """Service for read-only dependencies, served by a replica on safe requests"""
+        return cls(session, storage)
+
+    async def _get(self, video_id: int, load: LoadPlan = LoadPlan.bare) -> VideoModel | None:
+        video = get_loaded(self.session, VideoModel, video_id, LOAD_RELATIONSHIPS[load])
+        if video:
+            return video
+        video = await self.session.execute(GET_VIDEO[load], {"video_id": video_id})
         video = video.scalar()
         if not video:
             return
         return video
 
-    async def get(self, video_id: int) -> VideoModel | None:
-        video = await self._get(video_id)
+    async def get(self, video_id: int, load: LoadPlan = LoadPlan.bare) -> VideoModel | None:
+        video = await self._get(video_id, load)
         if not video:
             return
         return video
 
-    async def create(
-            self,
-            background_tasks: BackgroundTasks,
-            file: UploadFile,
-            video_data: VideoCreateSchema
-    ):
-        file_path = f"app/media/videos/{video_data.author.id}/{uuid4()}.mp4"
-
-        background_tasks.add_task(
-            self.save_video,
-            file,
-            file_path
-        )
+    async def get_status(self, video_id: int) -> dict | None:
+        async def load():
+            video = await self._get(video_id)
+            return VideoStatusSchema.from_orm(video) if video else None
+        return await self.cache.get_or_load(f"video:{video_id}:status", load)
+
+    async def create(self, request: Request, user: UserSchema) -> VideoSchema:
+        temp_path = self.blobs.temp_path()
+        parser = UploadParser(request, temp_path, required_fields=("title", "description"))
+        fields = await parser.parse()
+        try:
+            video_data = VideoCreateSchema(title=fields["title"], description=fields["description"], author=user)
+            file_hash = parser.file_hash.hexdigest()
+            key = await self.blobs.acquire(temp_path, file_hash, parser.file_size)
+        except BaseException:
+            # Once acquired the file belongs to storage, until then it's ours to remove
+            await run_io(self.blobs.remove_file, temp_path)
+            raise
 
         video = VideoModel(
             title=video_data.title,
             description=video_data.description,
             author_id=video_data.author.id,
-            file=file_path,
+            file=key,
+            etag=file_hash,
+            blob_hash=file_hash,
+            status=VideoStatus.ready,
             created_at=datetime.now()
         )
         self.session.add(video)
+        await self.session.flush()
+        await self.feed.fan_out(video.author_id, video.id)
         await self.session.commit()
+        await self.cache.invalidate(f"user:{video.author_id}:videos:")
 
         return VideoSchema(
             id=video.id,
             title=video.title,
             description=video.description,
             created_at=video.created_at,
+            status=video.status,
             author=video_data.author
         )
 
-    @staticmethod
-    def save_video(file: UploadFile, file_path: str):
-        makedirs(file_path.rsplit("/", 1)[0], exist_ok=True)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-    async def open_file(self, request: Request, video_id: int) -> tuple | None:
-        video = await self._get(video_id)
-        path = Path(video.file)
-        file = path.open("rb")
-        content_length = file_size = path.stat().st_size
-
-        status_code = 200
-        headers = {}
-        content_range = request.headers.get("range")
-
-        if content_range is not None:
-            content_range = content_range.strip().lower()
-            content_ranges = content_range.split('=')[-1]
-            range_start, range_end, *_ = map(str.strip, (content_ranges + '-').split('-'))
-            range_start = max(0, int(range_start)) if range_start else 0
-            range_end = min(file_size - 1, int(range_end)) if range_end else file_size - 1
-            content_length = (range_end - range_start) + 1
-            file = self.ranged(file, start=range_start, end=range_end + 1)
-            status_code = 206
-            headers['Content-Range'] = f'bytes {range_start}-{range_end}/{file_size}'
-
-        return file, status_code, content_length, headers
-
-    @staticmethod
-    def ranged(
-            file: IO[bytes],
-            start: int = 0,
-            end: int = None,
-            block_size: int = 8192,
-    ) -> Generator[bytes, None, None]:
-        consumed = 0
-        file.seek(start)
-        while True:
-            data_length = min(block_size, end - start - consumed) if end else block_size
-            if data_length <= 0:
-                break
-            data = file.read(data_length)
-            if not data:
-                break
-            consumed += data_length
-            yield data
-
-        if hasattr(file, 'close'):
-            file.close()
-
-    async def update(self, video_id: int, video_data: VideoUpdateSchema) -> VideoModel:
-        video = await self._get(video_id)
+    async def open_file(self, request: Request, video: VideoModel) -> tuple:
+        file_stat = await self.storage.stat(video.file)
+        etag = f'"{video.etag}"' if video.etag else None
+        status_code, ranges, headers = prepare_ranges(request.headers, file_stat.size, etag, file_stat.mtime)
+        return video.file, status_code, ranges, file_stat.size, headers
+
+    async def release(self):
+        """Return the session's connection to the pool, loaded objects stay readable"""
+        await self.session.close()
+
+    async def create_stream_token(self, video: VideoModel) -> StreamTokenPayload:
+        file_stat = await self.storage.stat(video.file)
+        etag = f'"{video.etag}"' if video.etag else None
+        return create_stream_token(video.file, etag, file_stat.size, file_stat.mtime)
+
+    async def update(self, video: VideoModel, video_data: VideoUpdateSchema) -> VideoModel:
         for field, value in video_data:
             if value is not None:
                 setattr(video, field, value)
         await self.session.commit()
-        return video
-
-    async def delete(self, video_id: int):
-        video = await self._get(video_id)
-        os.remove(os.path.join(os.path.realpath(__file__).replace("app\\videos\\services.py", ""), f"{video.file}"))
-        await self.session.delete(video)
-        await self.session.commit()
-
-    async def get_like_list(self, video_id: int) -> List[int]:
-        video = await self._get(video_id)
-        return [user.id for user in video.likes]
+        await self.cache.invalidate(f"video:{video.id}:", f"user:{video.author_id}:videos:")
+        return await self._get(video.id, LoadPlan.full)
 
-    async def like(self, video_id: int, user_id: int):
+    async def delete(self, video: VideoModel):
+        staged = await self.session.execute(
+            select(UploadModel.file)
+            .where(UploadModel.video_id == video.id)
+        )
+        staged = staged.scalars().all()
+        # Comments, likes and uploads go with the row through ON DELETE CASCADE
         await self.session.execute(
-            insert(likes_table)
-            .values(video_id=video_id, user_id=user_id)
+            delete(VideoModel)
+            .where(VideoModel.id == video.id)
         )
+        if video.blob_hash is not None:
+            await self.blobs.release(video.blob_hash)
+        self.session.expunge(video)
+        await self.session.commit()
+        await self.cache.invalidate(f"video:{video.id}:", f"user:{video.author_id}:videos:")
+        # Files are removed only once the rows are, a failed commit keeps both
+        if video.blob_hash is not None:
+            await self.blobs.purge(video.blob_hash)
+        elif video.file is not None:
+            await self.storage.delete(video.file)
+        # Unfinished or failed uploads leave their file staged
+        for file_name in staged:
+            await run_io(self.blobs.remove_file, self.blobs.staged_path(file_name))
+
+    async def get_likes(self, video_id: int, page: Pagination) -> List[dict]:
+        async def load():
+            users = await self.session.execute(page.apply(
+                select(UserModel)
+                .join(likes_table, likes_table.c.user_id == UserModel.id)
+                .where(likes_table.c.video_id == video_id),
+                likes_table.c.user_id
+            ))
+            return [UserSchema.from_orm(user) for user in users.scalars()]
+        return await self.cache.get_or_load(f"video:{video_id}:likes:{page.cache_key}", load)
+
+    async def like(self, video_id: int, user_id: int) -> bool:
+        result = await self.session.execute(LIKE_VIDEO, {"video_id": video_id, "user_id": user_id})
+        if result.rowcount:
+            await self._add_likes(video_id, 1)
+        await self.session.commit()
+        if result.rowcount:
+            await self.cache.invalidate(f"video:{video_id}:likes:")
+        return result.rowcount == 1
+
+    async def unlike(self, video_id: int, user_id: int) -> bool:
+        result = await self.session.execute(UNLIKE_VIDEO, {"video_id": video_id, "user_id": user_id})
+        if result.rowcount:
+            await self._add_likes(video_id, -1)
         await self.session.commit()
+        if result.rowcount:
+            await self.cache.invalidate(f"video:{video_id}:likes:")
+        return result.rowcount == 1
 
-    async def unlike(self, video_id: int, user_id: int):
+    async def _add_likes(self, video_id: int, amount: int):
         await self.session.execute(
-            delete(likes_table)
-            .where(and_(
-                likes_table.c.video_id == video_id,
-                likes_table.c.user_id == user_id)
-            )
+            update(VideoModel)
+            .where(VideoModel.id == video_id)
+            .values(likes_count=VideoModel.likes_count + amount)
         )
-        await self.session.commit()
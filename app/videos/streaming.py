@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, IO
+
+from app.config import settings
+
+io_executor = ThreadPoolExecutor(
+    max_workers=settings.stream_io_workers,
+    thread_name_prefix="video-io"
+)
+
+
+async def run_io(func, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, func, *args)
+
+
+def _read_at(file: IO[bytes], lock: threading.Lock, offset: int, size: int) -> bytes:
+    with lock:
+        file.seek(offset)
+        return file.read(size)
+
+
+class ChunkSizer:
+    """
+    Picks the size of the next streamed chunk
+
+    Starts from a sixteenth of the requested range, then follows the client's
+    measured throughput so that sending one chunk takes about
+    `stream_target_send_time`, always within the configured bounds
+    """
+    alignment = 4096
+
+    def __init__(self, range_length: int, min_size: int = None, max_size: int = None):
+        self.min_size = min_size or settings.stream_min_block_size
+        self.max_size = max(self.min_size, max_size or settings.stream_max_block_size)
+        self.size = self._clamp(range_length // 16)
+
+    def _clamp(self, size: int) -> int:
+        size = max(self.min_size, min(self.max_size, size))
+        return max(self.min_size, size - size % self.alignment)
+
+    def record(self, sent: int, elapsed: float):
+        if elapsed <= 0:
+            target = self.size * 2
+        else:
+            target = int(sent / elapsed * settings.stream_target_send_time)
+        self.size = self._clamp((self.size + target) // 2)
+
+
+async def iter_file_range(
+        path: str,
+        start: int,
+        end: int,
+        sizer: ChunkSizer = None,
+        read_ahead: int = None
+) -> AsyncIterator[bytes]:
+    """
+    Yield the `[start, end)` slice of a file in chunks sized by `sizer`
+
+    Up to `read_ahead` chunks are read on the I/O executor while the
+    current one is being sent, so disk and network work overlap
+    """
+    sizer = sizer or ChunkSizer(end - start)
+    read_ahead = settings.stream_read_ahead if read_ahead is None else read_ahead
+    loop = asyncio.get_running_loop()
+    file = await run_io(open, path, "rb")
+    lock = threading.Lock()
+    pending = deque()
+    offset = start
+    try:
+        while offset < end or pending:
+            while offset < end and len(pending) <= read_ahead:
+                size = min(sizer.size, end - offset)
+                future = loop.run_in_executor(io_executor, _read_at, file, lock, offset, size)
+                pending.append((future, size))
+                offset += size
+            future, size = pending.popleft()
+            chunk = await future
+            if len(chunk) != size:
+                raise RuntimeError(f"File at path {path} is shorter than expected.")
+            yield chunk
+    finally:
+        for future, _ in pending:
+            future.cancel()
+        await asyncio.gather(*(future for future, _ in pending), return_exceptions=True)
+        await run_io(file.close)
+
+
+def shutdown_io_executor():
+    io_executor.shutdown(wait=False, cancel_futures=True)
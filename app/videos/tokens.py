@@ -0,0 +1,68 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from app.config import settings
+
+
+class StreamTokenPayload(BaseModel):
+    key: str
+    etag: str | None
+    size: int
+    mtime: int
+    exp: int
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _signature(payload: str) -> str:
+    secret = (settings.stream_token_secret or settings.jwt_secret).encode()
+    return _b64encode(hmac.new(secret, payload.encode(), hashlib.sha256).digest())
+
+
+def create_stream_token(key: str, etag: str | None, size: int, mtime: float, now: float = None) -> StreamTokenPayload:
+    """
+    Expiry is rounded up to whole `stream_token_ttl` periods, so the same
+    file gets the same token for a while and pages embedding it stay cacheable
+    """
+    now = time.time() if now is None else now
+    ttl = settings.stream_token_ttl
+    return StreamTokenPayload(key=key, etag=etag, size=size, mtime=int(mtime), exp=(int(now) // ttl + 2) * ttl)
+
+
+def encode_stream_token(payload: StreamTokenPayload) -> str:
+    data = _b64encode(json.dumps(payload.dict(), separators=(",", ":")).encode())
+    return f"{data}.{_signature(data)}"
+
+
+def decode_stream_token(token: str) -> StreamTokenPayload:
+    exception = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Invalid stream token"
+    )
+
+    data, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature.encode(), _signature(data).encode()):
+        raise exception
+    try:
+        payload = StreamTokenPayload.parse_raw(_b64decode(data))
+    except (ValueError, ValidationError):
+        raise exception from None
+
+    if payload.exp < time.time():
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Stream token expired"
+        )
+    return payload
@@ -0,0 +1,176 @@
+import hashlib
+import os
+from enum import Enum
+from typing import Dict, IO, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.exceptions import RequestValidationError
+from fastapi.requests import Request
+from multipart.multipart import MultipartParser, parse_options_header
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+
+from app.config import settings
+from .streaming import run_io
+
+
+class PartMessage(Enum):
+    PART_BEGIN = 1
+    PART_DATA = 2
+    PART_END = 3
+    HEADER_FIELD = 4
+    HEADER_VALUE = 5
+    HEADER_END = 6
+    HEADERS_FINISHED = 7
+
+
+class UploadParser:
+    """
+    Incremental multipart parser for video uploads
+
+    Form fields are kept in memory up to `upload_max_field_size` bytes each,
+    while the `file` part is hashed and written straight to `file_path` on
+    the I/O executor as it arrives, so the upload is never spooled to a
+    temporary file
+    """
+
+    def __init__(
+            self,
+            request: Request,
+            file_path: str,
+            required_fields: Sequence[str] = (),
+            file_field: str = "file",
+            content_type: str = "video/mp4"
+    ):
+        self.request = request
+        self.file_path = file_path
+        self.required_fields = required_fields
+        self.file_field = file_field
+        self.content_type = content_type
+        self.messages = []
+        self.fields: Dict[str, str] = {}
+        self.file_hash = hashlib.sha256()
+        self.file_size = 0
+        self.file: IO[bytes] | None = None
+
+    def _callback(self, message: PartMessage):
+        def on_message(data: bytes = b"", start: int = 0, end: int = 0):
+            self.messages.append((message, data[start:end]))
+        return on_message
+
+    async def parse(self) -> Dict[str, str]:
+        content_type, params = parse_options_header(self.request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise self._missing_field(self.file_field)
+
+        parser = MultipartParser(params[b"boundary"], {
+            "on_part_begin": self._callback(PartMessage.PART_BEGIN),
+            "on_part_data": self._callback(PartMessage.PART_DATA),
+            "on_part_end": self._callback(PartMessage.PART_END),
+            "on_header_field": self._callback(PartMessage.HEADER_FIELD),
+            "on_header_value": self._callback(PartMessage.HEADER_VALUE),
+            "on_header_end": self._callback(PartMessage.HEADER_END),
+            "on_headers_finished": self._callback(PartMessage.HEADERS_FINISHED)
+        })
+
+        try:
+            await self._consume(parser)
+        except BaseException:
+            await self._discard()
+            raise
+
+        if self.file is None:
+            raise self._missing_field(self.file_field)
+        for name in self.required_fields:
+            if name not in self.fields:
+                await self._discard()
+                raise self._missing_field(name)
+        return self.fields
+
+    async def _consume(self, parser: MultipartParser):
+        header_field, header_value = b"", b""
+        part_headers = {}
+        field_name, field_data = None, b""
+        buffer = bytearray()
+        writing = False
+
+        async for chunk in self.request.stream():
+            parser.write(chunk)
+            messages, self.messages = self.messages, []
+            for message, data in messages:
+                if message == PartMessage.PART_BEGIN:
+                    part_headers, field_data = {}, b""
+                elif message == PartMessage.HEADER_FIELD:
+                    header_field += data
+                elif message == PartMessage.HEADER_VALUE:
+                    header_value += data
+                elif message == PartMessage.HEADER_END:
+                    part_headers[header_field.lower()] = header_value
+                    header_field, header_value = b"", b""
+                elif message == PartMessage.HEADERS_FINISHED:
+                    _, options = parse_options_header(part_headers.get(b"content-disposition", b""))
+                    field_name = options.get(b"name", b"").decode()
+                    writing = field_name == self.file_field and self.file is None and b"filename" in options
+                    if writing:
+                        await self._open(part_headers.get(b"content-type", b"").decode("latin-1"))
+                elif message == PartMessage.PART_DATA:
+                    if writing:
+                        buffer += data
+                    elif field_name != self.file_field:
+                        if len(field_data) + len(data) > settings.upload_max_field_size:
+                            raise HTTPException(
+                                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"Form field {field_name} is too large"
+                            )
+                        field_data += data
+                elif message == PartMessage.PART_END:
+                    if writing:
+                        await self._write(buffer)
+                        buffer = bytearray()
+                        writing = False
+                    elif field_name != self.file_field:
+                        self.fields[field_name] = field_data.decode()
+
+            if writing and len(buffer) >= settings.upload_buffer_size:
+                await self._write(buffer)
+                buffer = bytearray()
+
+        parser.finalize()
+        if self.file is not None:
+            await run_io(self.file.close)
+
+    async def _open(self, content_type: str):
+        if content_type != self.content_type:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="File type must be mp4"
+            )
+        await run_io(lambda: os.makedirs(os.path.dirname(self.file_path), exist_ok=True))
+        self.file = await run_io(open, self.file_path, "wb")
+
+    async def _write(self, data: bytearray):
+        if not data:
+            return
+
+        def write():
+            self.file_hash.update(data)
+            self.file.write(data)
+
+        await run_io(write)
+        self.file_size += len(data)
+
+    async def _discard(self):
+        if self.file is None:
+            return
+
+        def discard():
+            if not self.file.closed:
+                self.file.close()
+            if os.path.exists(self.file_path):
+                os.remove(self.file_path)
+
+        await run_io(discard)
+
+    @staticmethod
+    def _missing_field(name: str) -> RequestValidationError:
+        return RequestValidationError([ErrorWrapper(MissingError(), loc=("body", name))])
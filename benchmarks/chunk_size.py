@@ -0,0 +1,63 @@
+"""
+Requests/sec and CPU per GB served across streaming block sizes
+
+Streams a temporary file through iter_file_range into a no-op ASGI `send`
+for several concurrent requests, once per fixed block size and once with
+the adaptive ChunkSizer. Settings are read from the environment as usual.
+Run from the repository root: python -m benchmarks.chunk_size
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from app.videos.streaming import ChunkSizer, iter_file_range, shutdown_io_executor
+
+FILE_SIZE = 64 * 1024 * 1024
+CONCURRENCY = 16
+ROUNDS = 3
+BLOCK_SIZES = [8 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024]
+
+
+async def serve(path: str, block_size: int | None) -> int:
+    sizer = ChunkSizer(FILE_SIZE, block_size, block_size) if block_size else ChunkSizer(FILE_SIZE)
+    sends = 0
+
+    async def send(message):
+        await asyncio.sleep(0)
+
+    async for chunk in iter_file_range(path, 0, FILE_SIZE, sizer):
+        started = time.monotonic()
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        sizer.record(len(chunk), time.monotonic() - started)
+        sends += 1
+    return sends
+
+
+async def measure(path: str, block_size: int | None) -> tuple[float, float, int]:
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    sends = 0
+    for _ in range(ROUNDS):
+        sends += sum(await asyncio.gather(*(serve(path, block_size) for _ in range(CONCURRENCY))))
+    wall, cpu = time.perf_counter() - wall_started, time.process_time() - cpu_started
+    requests = ROUNDS * CONCURRENCY
+    gigabytes = requests * FILE_SIZE / 1024 ** 3
+    return requests / wall, cpu / gigabytes, sends // requests
+
+
+async def main():
+    with tempfile.NamedTemporaryFile(suffix=".mp4", delete=False) as file:
+        file.write(os.urandom(FILE_SIZE))
+    try:
+        print(f"{'block size':>12}{'requests/s':>14}{'cpu s/GB':>12}{'sends/request':>16}")
+        for block_size in BLOCK_SIZES + [None]:
+            rps, cpu_per_gb, sends = await measure(file.name, block_size)
+            label = f"{block_size // 1024} KiB" if block_size else "adaptive"
+            print(f"{label:>12}{rps:>14.2f}{cpu_per_gb:>12.3f}{sends:>16}")
+    finally:
+        os.unlink(file.name)
+        shutdown_io_executor()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
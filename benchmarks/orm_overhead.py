@@ -0,0 +1,129 @@
+"""
+Per-request ORM overhead of the hot queries
+
+Runs each query against an in-memory SQLite database, so the timings are
+dominated by statement construction, cache key generation and ORM loading
+rather than by the database. Compares statements built inline per call,
+as the services did before, with the prebuilt statements they use now.
+Run from the repository root: python -m benchmarks.orm_overhead
+"""
+import argparse
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, select, delete, insert as core_insert
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, joinedload
+
+from app.auth.services import GET_USER_BY_EMAIL
+from app.comments.models import CommentModel
+from app.comments.services import LIST_COMMENTS
+from app.database.database import Base
+from app.users.models import UserModel
+from app.users.services import GET_USER
+from app.videos.models import VideoModel, likes_table
+from app.videos.services import GET_VIDEO, LIKE_VIDEO, UNLIKE_VIDEO, LOAD_OPTIONS, LoadPlan
+
+COMMENTS = 20
+PAGE = 20
+
+
+def legacy_queries() -> dict:
+    return {
+        "video by id": lambda session: session.execute(
+            select(VideoModel)
+            .options(*LOAD_OPTIONS[LoadPlan.author])
+            .where(VideoModel.id == 1)
+        ).scalar(),
+        "user by id": lambda session: session.execute(
+            select(UserModel)
+            .where(UserModel.id == 1)
+        ).scalar(),
+        "comment list": lambda session: session.execute(
+            select(CommentModel)
+            .options(joinedload(CommentModel.author))
+            .where(CommentModel.video_id == 1)
+            .order_by(CommentModel.id)
+            .limit(PAGE + 1)
+        ).scalars().all(),
+        "like toggle": lambda session: (
+            session.execute(
+                insert(likes_table)
+                .values(video_id=1, user_id=1)
+                .on_conflict_do_nothing()
+            ),
+            session.execute(
+                delete(likes_table)
+                .where(likes_table.c.video_id == 1, likes_table.c.user_id == 1)
+            )
+        ),
+        "user by email": lambda session: session.execute(
+            select(UserModel)
+            .where(UserModel.email == "user1@test.com")
+        ).scalar()
+    }
+
+
+def prebuilt_queries() -> dict:
+    return {
+        "video by id": lambda session: session.execute(
+            GET_VIDEO[LoadPlan.author], {"video_id": 1}
+        ).scalar(),
+        "user by id": lambda session: session.execute(GET_USER, {"user_id": 1}).scalar(),
+        "comment list": lambda session: session.execute(
+            LIST_COMMENTS, {"video_id": 1, "after": 0, "limit": PAGE + 1}
+        ).scalars().all(),
+        "like toggle": lambda session: (
+            session.execute(LIKE_VIDEO, {"video_id": 1, "user_id": 1}),
+            session.execute(UNLIKE_VIDEO, {"video_id": 1, "user_id": 1})
+        ),
+        "user by email": lambda session: session.execute(
+            GET_USER_BY_EMAIL, {"email": "user1@test.com"}
+        ).scalar()
+    }
+
+
+def seed(engine):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(core_insert(UserModel), [
+            {"id": 1, "email": "user1@test.com", "username": "user1", "password": "-"}
+        ])
+        conn.execute(core_insert(VideoModel).values(
+            id=1, title="video", description="", file="blobs/00/00.mp4", author_id=1, created_at=datetime.now()
+        ))
+        conn.execute(core_insert(CommentModel), [
+            {"text": "comment", "author_id": 1, "video_id": 1, "created_at": datetime.now()}
+            for _ in range(COMMENTS)
+        ])
+
+
+def measure(engine, query, iterations: int) -> float:
+    # A fresh session per call, as every request gets one
+    for _ in range(10):
+        with Session(engine) as session:
+            query(session)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with Session(engine) as session:
+            query(session)
+    return (time.perf_counter() - started) / iterations
+
+
+def main(iterations: int):
+    engine = create_engine("sqlite://")
+    seed(engine)
+    legacy, prebuilt = legacy_queries(), prebuilt_queries()
+    print(f"{'query':<16}{'inline us':>12}{'prebuilt us':>14}{'saved':>8}")
+    for name in legacy:
+        before = measure(engine, legacy[name], iterations)
+        after = measure(engine, prebuilt[name], iterations)
+        print(f"{name:<16}{before * 1e6:>12.1f}{after * 1e6:>14.1f}{1 - after / before:>8.0%}")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.iterations)
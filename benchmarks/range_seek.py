@@ -0,0 +1,102 @@
+"""
+Bytes transferred per seek for typical player access patterns
+
+Compares the range engine with the previous `bytes=a-b`-only parser.
+Run from the repository root: python -m benchmarks.range_seek
+"""
+import hashlib
+
+from fastapi import HTTPException
+
+from app.storage.backends import LocalStorage
+from app.videos.ranges import parse_range_header
+from app.videos.responses import RangedFileResponse
+
+FILE_SIZE = 200 * 1024 * 1024
+MOOV_SIZE = 96 * 1024
+SEGMENT = 1024 * 1024
+
+
+def file_bytes(start: int, end: int) -> bytes:
+    """Content of the simulated file, every 32-byte block is distinct"""
+    blocks = b"".join(
+        hashlib.blake2b(block.to_bytes(8, "big"), digest_size=32).digest()
+        for block in range(start // 32, (end + 31) // 32)
+    )
+    return blocks[start % 32:start % 32 + end - start]
+
+
+def legacy_exchange(header: str) -> tuple[int, int, list]:
+    try:
+        content_range = header.strip().lower().split("=")[-1]
+        range_start, range_end, *_ = map(str.strip, (content_range + "-").split("-"))
+        range_start = max(0, int(range_start)) if range_start else 0
+        range_end = min(FILE_SIZE - 1, int(range_end)) if range_end else FILE_SIZE - 1
+    except ValueError:
+        return 500, 0, []
+    if range_end < range_start:
+        return 206, 0, []
+    return 206, range_end - range_start + 1, [(range_start, range_end + 1)]
+
+
+def engine_exchange(header: str) -> tuple[int, int, list]:
+    """Status, body length and the `[start, end)` file slices carried by the body"""
+    try:
+        ranges = parse_range_header(header, FILE_SIZE)
+    except HTTPException as exc:
+        return exc.status_code, 0, []
+    response = RangedFileResponse(LocalStorage("."), "video.mp4", ranges, FILE_SIZE, 206, media_type="video/mp4")
+    return 206, int(response.headers["content-length"]), [(start, end) for _, start, end in response.parts]
+
+
+def moov_probe(exchange) -> tuple[int, int, int]:
+    status_code, sent, slices = exchange(f"bytes=-{MOOV_SIZE}")
+    # Read only bodies of the right length, a longer one can't hold just the moov atom
+    if status_code == 206 and sum(end - start for start, end in slices) == MOOV_SIZE:
+        returned = b"".join(file_bytes(start, end) for start, end in slices)
+        if returned == file_bytes(FILE_SIZE - MOOV_SIZE, FILE_SIZE):
+            return 1, sent, 1
+    # The player got the wrong bytes back and downloads the file up to the moov atom
+    _, full, _ = exchange("bytes=0-")
+    return 2, sent + full, 1
+
+
+def scrubbing(exchange) -> tuple[int, int, int]:
+    seeks = [FILE_SIZE * i // 20 for i in range(20)]
+    total = sum(exchange(f"bytes={start}-{start + SEGMENT - 1}")[1] for start in seeks)
+    return len(seeks), total, len(seeks)
+
+
+def thumbnail_sampling(exchange) -> tuple[int, int, int]:
+    starts = [FILE_SIZE * i // 8 for i in range(8)]
+    header = "bytes=" + ",".join(f"{start}-{start + 64 * 1024 - 1}" for start in starts)
+    status_code, sent, _ = exchange(header)
+    if status_code == 206:
+        return 1, sent, len(starts)
+    total = sum(exchange(f"bytes={start}-{start + 64 * 1024 - 1}")[1] for start in starts)
+    return 1 + len(starts), total, len(starts)
+
+
+def seek_past_end(exchange) -> tuple[int, int, int]:
+    status_code, sent, _ = exchange(f"bytes={FILE_SIZE + 10}-")
+    return 1, sent, 1
+
+
+PATTERNS = {
+    "moov atom at end (suffix range)": moov_probe,
+    "scrubbing, 20 bounded seeks": scrubbing,
+    "thumbnail sampling, 8 ranges": thumbnail_sampling,
+    "seek past end of file": seek_past_end,
+}
+
+
+def main():
+    print(f"{'pattern':<34}{'engine':>8}{'requests':>10}{'bytes':>14}{'bytes/seek':>14}")
+    for name, pattern in PATTERNS.items():
+        for label, exchange in (("legacy", legacy_exchange), ("rfc7233", engine_exchange)):
+            requests, sent, seeks = pattern(exchange)
+            print(f"{name:<34}{label:>8}{requests:>10}{sent:>14}{sent // seeks:>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Event loop lag caused by a burst of sign-ins
+
+A probe coroutine stands in for the other endpoints of the worker: it wakes
+every 10 ms and records how late it was. Meanwhile a burst of concurrent
+password verifications runs either inline on the loop, as sign-in did before,
+or in the password process pool.
+Run from the repository root: python -m benchmarks.sign_in_lag
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from passlib.hash import bcrypt
+
+from app.auth import passwords
+from app.config import settings
+
+PROBE_INTERVAL = 0.01
+
+
+async def inline_verify(password: str, hashed_password: str) -> bool:
+    return bcrypt.verify(password, hashed_password)
+
+
+async def probe(lags: list, done: asyncio.Event):
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+
+async def burst(verify, hashed_password: str, sign_ins: int) -> tuple[float, list]:
+    lags = []
+    done = asyncio.Event()
+    probe_task = asyncio.create_task(probe(lags, done))
+    started = time.perf_counter()
+    await asyncio.gather(*(verify("qwerty", hashed_password) for _ in range(sign_ins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe_task
+    return elapsed, lags
+
+
+async def main(sign_ins: int):
+    hashed_password = bcrypt.using(rounds=settings.bcrypt_rounds).hash("qwerty")
+    # Start the workers before timing
+    await passwords.verify_password("qwerty", hashed_password)
+
+    print(f"{sign_ins} sign-ins, bcrypt cost {settings.bcrypt_rounds}, {settings.password_workers} workers")
+    print(f"{'mode':<10}{'sign-ins/s':>12}{'p50 lag ms':>12}{'p99 lag ms':>12}{'max lag ms':>12}")
+    for mode, verify in (("inline", inline_verify), ("pool", passwords.verify_password)):
+        elapsed, lags = await burst(verify, hashed_password, sign_ins)
+        lags = sorted(lags) or [0.0]
+        p99 = lags[min(len(lags) - 1, int(len(lags) * 0.99))]
+        print(
+            f"{mode:<10}{sign_ins / elapsed:>12.1f}{statistics.median(lags) * 1000:>12.1f}"
+            f"{p99 * 1000:>12.1f}{lags[-1] * 1000:>12.1f}"
+        )
+    passwords.shutdown_password_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sign-ins", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.sign_ins))
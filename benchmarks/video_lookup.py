@@ -0,0 +1,115 @@
+"""
+Cost of a single video lookup for each load plan on a popular video
+
+Seeds a video with 10k likes and 5k comments, then reports queries issued,
+rows fetched and mean latency per lookup, next to the previous joinedload graph.
+The legacy graph fetches comments x likes rows, so it is only timed with --legacy.
+Creates and drops all tables, so point it at a scratch database:
+python -m benchmarks.video_lookup --database benchmark
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import joinedload, sessionmaker
+
+from app.comments.models import CommentModel
+from app.database.database import Base
+from app.database.db_config import get_sqlalchemy_url
+from app.users.models import UserModel
+from app.videos.models import VideoModel, likes_table
+from app.videos.services import LOAD_OPTIONS
+
+LIKES = 10_000
+COMMENTS = 5_000
+
+LEGACY_OPTIONS = (
+    joinedload(VideoModel.author),
+    joinedload(VideoModel.comments),
+    joinedload(VideoModel.likes)
+)
+
+
+async def seed(engine):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(UserModel), [
+            {"id": i, "email": f"user{i}@test.com", "username": f"user{i}", "password": "-"}
+            for i in range(1, LIKES + 1)
+        ])
+        await conn.execute(insert(VideoModel).values(
+            id=1, title="popular", description="", file="blobs/00/00.mp4", author_id=1, created_at=datetime.now()
+        ))
+        await conn.execute(insert(likes_table), [
+            {"video_id": 1, "user_id": i} for i in range(1, LIKES + 1)
+        ])
+        await conn.execute(insert(CommentModel), [
+            {"text": "comment", "author_id": i, "video_id": 1, "created_at": datetime.now()}
+            for i in range(1, COMMENTS + 1)
+        ])
+
+
+def lookup(options):
+    return select(VideoModel).options(*options).where(VideoModel.id == 1)
+
+
+async def measure(engine, options, lookups: int) -> tuple[int, int, float]:
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    make_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    started = time.perf_counter()
+    for _ in range(lookups):
+        async with make_session() as session:
+            result = await session.execute(lookup(options))
+            result.unique().scalar()
+    elapsed = (time.perf_counter() - started) / lookups
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+    statements = statements[:len(statements) // lookups]
+    rows = 0
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"SELECT count(*) FROM ({statement}) AS q", parameters)
+            rows += result.scalar()
+    return len(statements), rows, elapsed
+
+
+async def main(url: str, lookups: int, legacy: bool):
+    engine = create_async_engine(url)
+    try:
+        await seed(engine)
+        print(f"{'plan':<20}{'queries':>10}{'rows':>14}{'ms/lookup':>12}")
+        if legacy:
+            queries, rows, elapsed = await measure(engine, LEGACY_OPTIONS, 1)
+            print(f"{'legacy joinedload':<20}{queries:>10}{rows:>14}{elapsed * 1000:>12.1f}")
+        else:
+            # Eager joins are dropped from ORM subqueries, so count over the compiled statement
+            statement = lookup(LEGACY_OPTIONS).compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+            async with engine.connect() as conn:
+                result = await conn.exec_driver_sql(f"SELECT count(*) FROM ({statement}) AS q")
+            print(f"{'legacy joinedload':<20}{1:>10}{result.scalar():>14}{'skipped':>12}")
+        for plan, options in LOAD_OPTIONS.items():
+            queries, rows, elapsed = await measure(engine, options, lookups)
+            print(f"{plan.value:<20}{queries:>10}{rows:>14}{elapsed * 1000:>12.1f}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database", default="benchmark")
+    parser.add_argument("--url", help="full SQLAlchemy url, overrides --database")
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--legacy", action="store_true", help="also time the legacy joinedload graph")
+    args = parser.parse_args()
+    asyncio.run(main(args.url or get_sqlalchemy_url(database=args.database), args.lookups, args.legacy))
@@ -1,4 +1,12 @@
+import time
+
 import pytest
+from sqlalchemy import select
+
+from app.auth.tokens import JoseBackend, cache_user, get_cached_user
+from app.config import settings
+from app.users.models import UserModel
+from app.users.schemas import UserSchema
 
 
 class TestSignUp:
@@ -56,3 +64,68 @@ class TestSignIn:
         )
         assert resp.status_code == 401
         assert resp.json()["detail"] == "Could not validate credentials"
+
+    @pytest.mark.anyio
+    async def test_login_rehashes_password(self, client, session, user_to_create, monkeypatch):
+        monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+        user_data = user_to_create.dict()
+        await client.post(
+            "/auth/sign-up",
+            json=user_data
+        )
+
+        monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+        resp = await client.post(
+            "/auth/sign-in",
+            data={
+                "username": user_data["email"],
+                "password": user_data["password"]
+            }
+        )
+        assert resp.status_code == 200
+        password = await session.scalar(
+            select(UserModel.password)
+            .where(UserModel.email == user_data["email"])
+        )
+        assert password.startswith("$2b$04$")
+
+        resp = await client.post(
+            "/auth/sign-in",
+            data={
+                "username": user_data["email"],
+                "password": user_data["password"]
+            }
+        )
+        assert resp.status_code == 200
+
+
+class TestTokenCache:
+    @pytest.mark.anyio
+    async def test_cached_token_skips_decoding(self, client, authorized_client_token, monkeypatch):
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 200
+
+        def decode(self, token):
+            raise AssertionError("token decoded twice")
+
+        monkeypatch.setattr(JoseBackend, "decode", decode)
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 200
+
+    @pytest.mark.anyio
+    async def test_expired_token_is_not_served(self, client):
+        user = UserSchema(id=1, username="test")
+        cache_user("expired token", user, time.time() - 1)
+        assert get_cached_user("expired token") is None
+
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": "Bearer expired token"}
+        )
+        assert resp.status_code == 401
@@ -45,7 +45,7 @@ class TestLeaveComment:
 
 class TestDeleteComment:
     @pytest.mark.anyio
-    async def test_success_delete_comment(self, client, authorized_client_token, uploaded_video_id):
+    async def test_success_delete_comment(self, client, authorized_client_token, uploaded_video_id, count_queries):
         resp = await client.post(
             f"/videos/{uploaded_video_id}/comments",
             json={
@@ -54,11 +54,13 @@ class TestDeleteComment:
             },
             headers={"Authorization": f"Bearer {authorized_client_token}"}
         )
-        resp = await client.delete(
-            f"/videos/{uploaded_video_id}/comments/{resp.json()['id']}",
-            headers={"Authorization": f"Bearer {authorized_client_token}"}
-        )
+        with count_queries() as queries:
+            resp = await client.delete(
+                f"/videos/{uploaded_video_id}/comments/{resp.json()['id']}",
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
         assert resp.status_code == 204
+        assert queries.count("SELECT", "comments") == 1
 
     @pytest.mark.anyio
     async def test_delete_comment_by_unauthorized_user(self, client, authorized_client_token, uploaded_video_id):
@@ -206,9 +208,89 @@ class TestGetListComments:
         assert resp.json()["detail"] == "Video doesn't exist"
 
 
+class TestGetCommentTree:
+    @staticmethod
+    async def leave_comment(client, token, video_id, answer_to=0):
+        resp = await client.post(
+            f"/videos/{video_id}/comments",
+            json={
+                "text": "test comment",
+                "answer_to": answer_to
+            },
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        return resp.json()["id"]
+
+    @pytest.mark.anyio
+    async def test_success_get_comment_tree(self, client, authorized_client_token, uploaded_video_id):
+        thread_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id)
+        reply_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id, thread_id)
+        nested_reply_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id, reply_id)
+        second_thread_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id)
+
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/comments/tree"
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [comment["id"] for comment in data] == [thread_id, second_thread_id]
+        assert data[0]["replies_count"] == 1
+        reply = data[0]["replies"][0]
+        assert reply["id"] == reply_id
+        assert reply["author"] == {"username": "test", "id": 1}
+        assert [comment["id"] for comment in reply["replies"]] == [nested_reply_id]
+        assert data[1]["replies"] == []
+
+    @pytest.mark.anyio
+    async def test_get_comment_tree_with_limits(self, client, authorized_client_token, uploaded_video_id):
+        thread_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id)
+        reply_ids = [
+            await self.leave_comment(client, authorized_client_token, uploaded_video_id, thread_id)
+            for _ in range(3)
+        ]
+        await self.leave_comment(client, authorized_client_token, uploaded_video_id, reply_ids[0])
+
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/comments/tree?depth=1&replies=2"
+        )
+        assert resp.status_code == 200
+        thread = resp.json()[0]
+        assert thread["replies_count"] == 3
+        assert [comment["id"] for comment in thread["replies"]] == reply_ids[:2]
+        assert thread["replies"][0]["replies_count"] == 1
+        assert thread["replies"][0]["replies"] == []
+
+    @pytest.mark.anyio
+    async def test_get_comment_tree_by_pages(self, client, authorized_client_token, uploaded_video_id):
+        thread_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id)
+        await self.leave_comment(client, authorized_client_token, uploaded_video_id, thread_id)
+        second_thread_id = await self.leave_comment(client, authorized_client_token, uploaded_video_id)
+
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/comments/tree?limit=1"
+        )
+        assert resp.status_code == 200
+        assert [comment["id"] for comment in resp.json()] == [thread_id]
+        assert len(resp.json()[0]["replies"]) == 1
+
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/comments/tree?limit=1&cursor={resp.headers['X-Next-Cursor']}"
+        )
+        assert [comment["id"] for comment in resp.json()] == [second_thread_id]
+        assert "X-Next-Cursor" not in resp.headers
+
+    @pytest.mark.anyio
+    async def test_get_comment_tree_on_not_existing_video(self, client):
+        resp = await client.get(
+            "/videos/999/comments/tree"
+        )
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "Video doesn't exist"
+
+
 class TestUpdateComment:
     @pytest.mark.anyio
-    async def test_success_update_comment(self, client, authorized_client_token, uploaded_video_id):
+    async def test_success_update_comment(self, client, authorized_client_token, uploaded_video_id, count_queries):
         comment_resp = await client.post(
             f"/videos/{uploaded_video_id}/comments",
             json={
@@ -217,15 +299,49 @@ class TestUpdateComment:
             },
             headers={"Authorization": f"Bearer {authorized_client_token}"}
         )
-        resp = await client.patch(
+        with count_queries() as queries:
+            resp = await client.patch(
+                f"/videos/{uploaded_video_id}/comments/{comment_resp.json()['id']}",
+                json={
+                    "text": "updated comment"
+                },
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+        assert resp.status_code == 200
+        assert resp.json()["text"] == "updated comment"
+        assert queries.count("SELECT", "comments") == 1
+
+    @pytest.mark.anyio
+    async def test_get_comments_after_update(self, client, authorized_client_token, uploaded_video_id):
+        comment_resp = await client.post(
+            f"/videos/{uploaded_video_id}/comments",
+            json={
+                "text": "test comment",
+                "answer_to": 0
+            },
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        await client.get(
+            f"/videos/{uploaded_video_id}/comments"
+        )
+        await client.get(
+            f"/videos/{uploaded_video_id}/comments/tree"
+        )
+        await client.patch(
             f"/videos/{uploaded_video_id}/comments/{comment_resp.json()['id']}",
             json={
                 "text": "updated comment"
             },
             headers={"Authorization": f"Bearer {authorized_client_token}"}
         )
-        assert resp.status_code == 200
-        assert resp.json()["text"] == "updated comment"
+        list_resp = await client.get(
+            f"/videos/{uploaded_video_id}/comments"
+        )
+        tree_resp = await client.get(
+            f"/videos/{uploaded_video_id}/comments/tree"
+        )
+        assert list_resp.json()[0]["text"] == "updated comment"
+        assert tree_resp.json()[0]["text"] == "updated comment"
 
     @pytest.mark.anyio
     async def test_update_comment_on_not_existing_video(self, client, authorized_client_token, uploaded_video_id):
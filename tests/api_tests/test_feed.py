@@ -0,0 +1,221 @@
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture
+async def follower_token(client, authorized_client_token):
+    await client.post(
+        "/auth/sign-up",
+        json={
+            "email": "follower@test.com",
+            "username": "follower",
+            "password": "qwerty"
+        }
+    )
+    resp = await client.post(
+        "/auth/sign-in",
+        data={
+            "username": "follower@test.com",
+            "password": "qwerty"
+        }
+    )
+    token = resp.json()["access_token"]
+    await client.put(
+        "/users/1/subscribers",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    return token
+
+
+class TestGetFeed:
+    @pytest.mark.anyio
+    async def test_success_get_feed(self, client, follower_token, uploaded_video_id):
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {follower_token}"}
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data) == 1
+        assert data[0]["id"] == uploaded_video_id
+        assert data[0]["author"]["id"] == 1
+
+    @pytest.mark.anyio
+    async def test_feed_of_celebrity_author(self, client, follower_token, uploaded_video_id, monkeypatch):
+        monkeypatch.setattr(settings, "feed_fanout_limit", 0)
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {follower_token}"}
+        )
+        assert resp.status_code == 200
+        assert [video["id"] for video in resp.json()] == [uploaded_video_id]
+
+    @pytest.mark.anyio
+    async def test_feed_after_subscription_change(self, client, authorized_client_token, uploaded_video_id):
+        await client.post(
+            "/auth/sign-up",
+            json={
+                "email": "second@test.com",
+                "username": "second user",
+                "password": "qwerty"
+            }
+        )
+        resp = await client.post(
+            "/auth/sign-in",
+            data={
+                "username": "second@test.com",
+                "password": "qwerty"
+            }
+        )
+        new_client_token = resp.json()["access_token"]
+
+        await client.put(
+            "/users/1/subscribers",
+            headers={"Authorization": f"Bearer {new_client_token}"}
+        )
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {new_client_token}"}
+        )
+        assert [video["id"] for video in resp.json()] == [uploaded_video_id]
+
+        await client.delete(
+            "/users/1/subscribers",
+            headers={"Authorization": f"Bearer {new_client_token}"}
+        )
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {new_client_token}"}
+        )
+        assert resp.status_code == 200
+        assert resp.json() == []
+
+    @pytest.mark.anyio
+    async def test_get_feed_by_pages(self, client, authorized_client_token, follower_token, video_file):
+        video_ids = []
+        for i in range(3):
+            video_file["file"][1].seek(0)
+            resp = await client.post(
+                "/videos/upload",
+                data={
+                    "title": f"Test video {i}",
+                    "description": "Test description"
+                },
+                files=video_file,
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+            video_ids.append(resp.json()["id"])
+
+        resp = await client.get(
+            "/users/me/feed?limit=2",
+            headers={"Authorization": f"Bearer {follower_token}"}
+        )
+        assert resp.status_code == 200
+        first_page = [video["id"] for video in resp.json()]
+        cursor = resp.headers["X-Next-Cursor"]
+
+        resp = await client.get(
+            f"/users/me/feed?limit=2&cursor={cursor}",
+            headers={"Authorization": f"Bearer {follower_token}"}
+        )
+        second_page = [video["id"] for video in resp.json()]
+        for video_id in video_ids:
+            await client.delete(
+                f"/videos/{video_id}",
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+        assert first_page + second_page == video_ids[::-1]
+        assert "X-Next-Cursor" not in resp.headers
+
+    @pytest.mark.anyio
+    async def test_feed_after_author_drops_to_fanout_limit(
+            self,
+            client,
+            authorized_client_token,
+            follower_token,
+            video_file,
+            monkeypatch
+    ):
+        monkeypatch.setattr(settings, "feed_fanout_limit", 1)
+        await client.post(
+            "/auth/sign-up",
+            json={
+                "email": "second@test.com",
+                "username": "second user",
+                "password": "qwerty"
+            }
+        )
+        resp = await client.post(
+            "/auth/sign-in",
+            data={
+                "username": "second@test.com",
+                "password": "qwerty"
+            }
+        )
+        second_token = resp.json()["access_token"]
+        await client.put(
+            "/users/1/subscribers",
+            headers={"Authorization": f"Bearer {second_token}"}
+        )
+        # The author is above the limit, so the video is pulled rather than pushed
+        resp = await client.post(
+            "/videos/upload",
+            data={
+                "title": "Test video",
+                "description": "Test description"
+            },
+            files=video_file,
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        video_id = resp.json()["id"]
+        await client.delete(
+            "/users/1/subscribers",
+            headers={"Authorization": f"Bearer {second_token}"}
+        )
+
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {follower_token}"}
+        )
+        await client.delete(
+            f"/videos/{video_id}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert [video["id"] for video in resp.json()] == [video_id]
+
+    @pytest.mark.anyio
+    async def test_feed_keeps_latest_videos(self, client, authorized_client_token, follower_token, video_file, monkeypatch):
+        monkeypatch.setattr(settings, "feed_timeline_size", 2)
+        video_ids = []
+        for i in range(3):
+            video_file["file"][1].seek(0)
+            resp = await client.post(
+                "/videos/upload",
+                data={
+                    "title": f"Test video {i}",
+                    "description": "Test description"
+                },
+                files=video_file,
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+            video_ids.append(resp.json()["id"])
+
+        resp = await client.get(
+            "/users/me/feed",
+            headers={"Authorization": f"Bearer {follower_token}"}
+        )
+        for video_id in video_ids:
+            await client.delete(
+                f"/videos/{video_id}",
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+        assert [video["id"] for video in resp.json()] == video_ids[:0:-1]
+
+    @pytest.mark.anyio
+    async def test_get_feed_by_unauthorized_user(self, client):
+        resp = await client.get(
+            "/users/me/feed"
+        )
+        assert resp.status_code == 401
+        assert resp.json()["detail"] == "Not authenticated"
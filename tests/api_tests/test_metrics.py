@@ -0,0 +1,41 @@
+import pytest
+
+from app.config import settings
+
+
+class TestGetPoolMetrics:
+    @pytest.mark.anyio
+    async def test_success_get_pool_metrics(self, client):
+        resp = await client.get(
+            "/metrics/pool"
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["size"] == settings.db_pool_size
+        assert data["max_overflow"] == settings.db_max_overflow
+        assert data["checked_out"] >= 0
+        buckets = data["wait_time"]["buckets"]
+        assert [bucket["count"] for bucket in buckets] == sorted(bucket["count"] for bucket in buckets)
+        assert buckets[-1]["count"] <= data["wait_time"]["count"]
+
+
+class TestGetCacheMetrics:
+    @pytest.mark.anyio
+    async def test_success_get_cache_metrics(self, client, authorized_client_token):
+        before = (await client.get("/metrics/cache")).json()
+        await client.get(
+            "/users/1"
+        )
+        await client.get(
+            "/users/1"
+        )
+        resp = await client.get(
+            "/metrics/cache"
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["backend"] == settings.cache_backend
+        assert data["misses"] == before["misses"] + 1
+        assert data["hits"] == before["hits"] + 1
+        assert data["entries"] == 1
+        assert 0 < data["size"] <= data["max_size"]
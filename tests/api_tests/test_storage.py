@@ -0,0 +1,127 @@
+import os
+from email.utils import formatdate
+
+import httpx
+import pytest
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.app import app
+from app.storage.backends import S3Storage, get_storage
+
+
+class FakeS3:
+    """In-process stand-in for an S3-compatible server with path-style buckets"""
+
+    def __init__(self):
+        self.objects = {}
+        self.requests = []
+
+    async def __call__(self, scope, receive, send):
+        request = Request(scope, receive)
+        self.requests.append(request)
+        key = request.url.path
+        if not request.headers.get("authorization", "").startswith("AWS4-HMAC-SHA256 Credential=key/"):
+            response = Response(status_code=403)
+        elif request.method == "PUT":
+            self.objects[key] = await request.body()
+            response = Response(status_code=200)
+        elif key not in self.objects:
+            response = Response(status_code=404)
+        elif request.method == "DELETE":
+            del self.objects[key]
+            response = Response(status_code=204)
+        else:
+            data = self.objects[key]
+            headers = {"Last-Modified": formatdate(usegmt=True), "Content-Length": str(len(data))}
+            status_code = 200
+            if "range" in request.headers:
+                first, last = request.headers["range"].removeprefix("bytes=").split("-")
+                data = data[int(first):int(last) + 1]
+                headers["Content-Length"] = str(len(data))
+                status_code = 206
+            response = Response(data if request.method == "GET" else b"", status_code, headers)
+        await response(scope, receive, send)
+
+
+@pytest.fixture
+def fake_s3():
+    return FakeS3()
+
+
+@pytest.fixture
+async def s3_storage(fake_s3):
+    storage = S3Storage(
+        endpoint_url="http://minio:9000",
+        bucket="media",
+        access_key="key",
+        secret_key="secret",
+        transport=httpx.ASGITransport(app=fake_s3)
+    )
+    yield storage
+    await storage.close()
+
+
+async def _chunks(data: bytes):
+    yield data[:10]
+    yield data[10:]
+
+
+class TestS3Storage:
+    @pytest.mark.anyio
+    async def test_write_and_read_range(self, s3_storage, fake_s3):
+        data = bytes(range(256)) * 4
+        await s3_storage.write("blobs/ab/ab.mp4", _chunks(data), len(data))
+
+        file_stat = await s3_storage.stat("blobs/ab/ab.mp4")
+        chunks = [chunk async for chunk in s3_storage.read_range("blobs/ab/ab.mp4", 100, 200)]
+        assert file_stat.size == len(data)
+        assert b"".join(chunks) == data[100:200]
+        assert fake_s3.requests[-1].headers["range"] == "bytes=100-199"
+
+    @pytest.mark.anyio
+    async def test_read_not_existing_object(self, s3_storage):
+        assert not await s3_storage.exists("blobs/00/00.mp4")
+        with pytest.raises(FileNotFoundError):
+            await s3_storage.stat("blobs/00/00.mp4")
+
+    @pytest.mark.anyio
+    async def test_delete(self, s3_storage, fake_s3):
+        await s3_storage.write("blobs/ab/ab.mp4", _chunks(b"data"), 4)
+        await s3_storage.delete("blobs/ab/ab.mp4")
+        assert fake_s3.objects == {}
+
+    @pytest.mark.anyio
+    async def test_stream_video_from_s3(self, client, authorized_client_token, s3_storage, fake_s3):
+        app.dependency_overrides[get_storage] = lambda: s3_storage
+        try:
+            with open(os.path.join(os.path.dirname(__file__), "../assets/video_test.mp4"), "rb") as file:
+                video_bytes = file.read()
+                file.seek(0)
+                resp = await client.post(
+                    "/videos/upload",
+                    data={
+                        "title": "test video",
+                        "description": "test description"
+                    },
+                    files={"file": ("video_test.mp4", file, "video/mp4")},
+                    headers={"Authorization": f"Bearer {authorized_client_token}"}
+                )
+            video_id = resp.json()["id"]
+
+            resp = await client.get(
+                f"/videos/{video_id}/watching",
+                headers={"Range": "bytes=10-19"}
+            )
+            range_header = fake_s3.requests[-1].headers["range"]
+            await client.delete(
+                f"/videos/{video_id}",
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+        finally:
+            del app.dependency_overrides[get_storage]
+
+        assert resp.status_code == 206
+        assert resp.content == video_bytes[10:20]
+        assert range_header == "bytes=10-19"
+        assert fake_s3.objects == {}
@@ -0,0 +1,211 @@
+import os
+
+import pytest
+
+from app.config import settings
+from app.storage.backends import LocalStorage
+
+
+@pytest.fixture
+def video_bytes():
+    with open(os.path.join(os.path.dirname(__file__), "../assets/video_test.mp4"), "rb") as file:
+        return file.read()
+
+
+@pytest.fixture
+async def upload_id(client, authorized_client_token, video_bytes):
+    resp = await client.post(
+        "/videos/uploads",
+        json={
+            "title": "test video",
+            "description": "test description",
+            "length": len(video_bytes)
+        },
+        headers={"Authorization": f"Bearer {authorized_client_token}"}
+    )
+    return resp.json()["id"]
+
+
+class TestCreateUpload:
+    @pytest.mark.anyio
+    async def test_success_create_upload(self, client, authorized_client_token):
+        resp = await client.post(
+            "/videos/uploads",
+            json={
+                "title": "test video",
+                "description": "test description",
+                "length": 100
+            },
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 201
+        assert resp.headers["location"] == f"/videos/uploads/{resp.json()['id']}"
+        assert resp.headers["upload-offset"] == "0"
+        await client.delete(
+            resp.headers["location"],
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+
+    @pytest.mark.anyio
+    async def test_create_upload_by_unauthorized_user(self, client):
+        resp = await client.post(
+            "/videos/uploads",
+            json={
+                "title": "test video",
+                "description": "test description",
+                "length": 100
+            }
+        )
+        assert resp.status_code == 401
+        assert resp.json()["detail"] == "Not authenticated"
+
+
+class TestUploadChunk:
+    @pytest.mark.anyio
+    async def test_success_resume_upload(self, client, authorized_client_token, upload_id, video_bytes):
+        headers = {
+            "Authorization": f"Bearer {authorized_client_token}",
+            "Content-Type": "application/offset+octet-stream"
+        }
+        middle = len(video_bytes) // 2
+        resp = await client.patch(
+            f"/videos/uploads/{upload_id}",
+            content=video_bytes[:middle],
+            headers={**headers, "Upload-Offset": "0"}
+        )
+        video_id = resp.json()["video_id"]
+        assert resp.status_code == 200
+
+        resp = await client.get(f"/videos/{video_id}/status")
+        assert resp.json()["status"] == "uploading"
+        resp = await client.get(f"/videos/{video_id}/watching")
+        assert resp.status_code == 409
+        assert resp.json()["detail"] == "Video is still uploading"
+
+        resp = await client.head(
+            f"/videos/uploads/{upload_id}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.headers["upload-offset"] == str(middle)
+
+        resp = await client.patch(
+            f"/videos/uploads/{upload_id}",
+            content=video_bytes[middle:],
+            headers={**headers, "Upload-Offset": str(middle)}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["offset"] == len(video_bytes)
+
+        resp = await client.get(f"/videos/{video_id}/status")
+        assert resp.json()["status"] == "ready"
+
+        resp = await client.get(f"/videos/{video_id}/watching")
+        await client.delete(
+            f"/videos/{video_id}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.content == video_bytes
+
+    @pytest.mark.anyio
+    async def test_upload_fails_when_storage_fails(
+            self,
+            client,
+            authorized_client_token,
+            upload_id,
+            video_bytes,
+            monkeypatch
+    ):
+        async def put_file(self, key, path):
+            raise OSError("storage unavailable")
+
+        monkeypatch.setattr(LocalStorage, "put_file", put_file)
+        resp = await client.patch(
+            f"/videos/uploads/{upload_id}",
+            content=video_bytes,
+            headers={
+                "Authorization": f"Bearer {authorized_client_token}",
+                "Content-Type": "application/offset+octet-stream",
+                "Upload-Offset": "0"
+            }
+        )
+        assert resp.status_code == 200
+        assert resp.headers["upload-offset"] == str(len(video_bytes))
+        video_id = resp.json()["video_id"]
+
+        resp = await client.get(f"/videos/{video_id}/status")
+        assert resp.json()["status"] == "failed"
+        assert f"{upload_id}.part" in os.listdir(settings.upload_dir)
+
+        resp = await client.delete(
+            f"/videos/{video_id}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 204
+        assert f"{upload_id}.part" not in os.listdir(settings.upload_dir)
+
+    @pytest.mark.anyio
+    async def test_upload_chunk_with_wrong_offset(self, client, authorized_client_token, upload_id, video_bytes):
+        resp = await client.patch(
+            f"/videos/uploads/{upload_id}",
+            content=video_bytes[:100],
+            headers={
+                "Authorization": f"Bearer {authorized_client_token}",
+                "Content-Type": "application/offset+octet-stream",
+                "Upload-Offset": "100"
+            }
+        )
+        await client.delete(
+            f"/videos/uploads/{upload_id}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 409
+        assert resp.json()["detail"] == "Upload offset doesn't match"
+
+    @pytest.mark.anyio
+    async def test_upload_chunk_to_foreign_upload(self, client, authorized_client_token, upload_id, video_bytes):
+        await client.post(
+            "/auth/sign-up",
+            json={
+                "email": "second@test.com",
+                "username": "second_user",
+                "password": "qwerty"
+            }
+        )
+        resp = await client.post(
+            "/auth/sign-in",
+            data={
+                "username": "second@test.com",
+                "password": "qwerty"
+            }
+        )
+        new_client_token = resp.json()["access_token"]
+
+        resp = await client.patch(
+            f"/videos/uploads/{upload_id}",
+            content=video_bytes[:100],
+            headers={
+                "Authorization": f"Bearer {new_client_token}",
+                "Content-Type": "application/offset+octet-stream",
+                "Upload-Offset": "0"
+            }
+        )
+        await client.delete(
+            f"/videos/uploads/{upload_id}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "Don't have permission"
+
+    @pytest.mark.anyio
+    async def test_upload_chunk_to_not_existing_upload(self, client, authorized_client_token):
+        resp = await client.patch(
+            "/videos/uploads/999",
+            content=b"data",
+            headers={
+                "Authorization": f"Bearer {authorized_client_token}",
+                "Content-Type": "application/offset+octet-stream",
+                "Upload-Offset": "0"
+            }
+        )
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "Upload doesn't exist"
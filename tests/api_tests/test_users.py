@@ -18,10 +18,35 @@ class TestGetUserInfo:
         assert resp.status_code == 404
         assert resp.json()["detail"] == "User doesn't exist"
 
+    @pytest.mark.anyio
+    async def test_get_cached_user_info(self, client, authorized_client_token, count_queries):
+        await client.get(
+            "/users/1"
+        )
+        with count_queries() as queries:
+            resp = await client.get(
+                "/users/1"
+            )
+        assert resp.status_code == 200
+        assert resp.json()["username"] == "test"
+        assert queries == []
+
+        await client.patch(
+            "/users/1",
+            json={
+                "username": "new username"
+            },
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        resp = await client.get(
+            "/users/1"
+        )
+        assert resp.json()["username"] == "new username"
+
 
 class TestUpdateUserInfo:
     @pytest.mark.anyio
-    async def test_success_update_user_info(self, client):
+    async def test_success_update_user_info(self, client, count_queries):
         await client.post(
             "/auth/sign-up",
             json={
@@ -37,18 +62,21 @@ class TestUpdateUserInfo:
                 "password": "qwerty"
             }
         )
-        resp = await client.patch(
-            "/users/1",
-            json={
-                "username": "new username",
-                "bio": "new bio"
-            },
-            headers={"Authorization": f"Bearer {resp.json()['access_token']}"}
-        )
+        with count_queries() as queries:
+            resp = await client.patch(
+                "/users/1",
+                json={
+                    "username": "new username",
+                    "bio": "new bio"
+                },
+                headers={"Authorization": f"Bearer {resp.json()['access_token']}"}
+            )
         assert resp.status_code == 200
         data = resp.json()
         assert data["username"] == "new username"
         assert data["bio"] == "new bio"
+        # The user loaded by valid_user_id is reused by the service
+        assert queries.count("SELECT", "users") == 1
 
     @pytest.mark.anyio
     async def test_update_foreign_user_info(self, client, authorized_client_token):
@@ -231,6 +259,10 @@ class TestSubscribeToUser:
         )
         assert resp.status_code == 200
         assert len(resp.json()) == 1
+        resp = await client.get(
+            "/users/1"
+        )
+        assert resp.json()["subscribers"] == 1
 
     @pytest.mark.anyio
     async def test_subscribe_on_yourself(self, client, authorized_client_token):
@@ -277,6 +309,10 @@ class TestUnsubscribeFromUser:
         )
         assert resp.status_code == 200
         assert len(resp.json()) == 0
+        resp = await client.get(
+            "/users/1"
+        )
+        assert resp.json()["subscribers"] == 0
 
     @pytest.mark.anyio
     async def test_unsubscribe_from_not_existing_user(self, client, authorized_client_token):
@@ -373,6 +409,51 @@ class TestGetUserSubscribers:
         assert resp.status_code == 200
         assert len(resp.json()) == 1
 
+    @pytest.mark.anyio
+    async def test_get_user_subscribers_by_pages(self, client, authorized_client_token):
+        for number in range(3):
+            await client.post(
+                "/auth/sign-up",
+                json={
+                    "email": f"subscriber{number}@test.com",
+                    "username": f"subscriber {number}",
+                    "password": "qwerty"
+                }
+            )
+            resp = await client.post(
+                "/auth/sign-in",
+                data={
+                    "username": f"subscriber{number}@test.com",
+                    "password": "qwerty"
+                }
+            )
+            await client.put(
+                "/users/1/subscribers",
+                headers={"Authorization": f"Bearer {resp.json()['access_token']}"}
+            )
+
+        first_page = await client.get(
+            "/users/1/subscribers",
+            params={"limit": 2}
+        )
+        second_page = await client.get(
+            "/users/1/subscribers",
+            params={"limit": 2, "cursor": first_page.headers["x-next-cursor"]}
+        )
+        assert [user["username"] for user in first_page.json()] == ["subscriber 0", "subscriber 1"]
+        assert 'rel="next"' in first_page.headers["link"]
+        assert [user["username"] for user in second_page.json()] == ["subscriber 2"]
+        assert "x-next-cursor" not in second_page.headers
+
+    @pytest.mark.anyio
+    async def test_get_user_subscribers_with_invalid_cursor(self, client, authorized_client_token):
+        resp = await client.get(
+            "/users/1/subscribers",
+            params={"cursor": "not a cursor"}
+        )
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == "Invalid cursor"
+
     @pytest.mark.anyio
     async def test_get_subscribers_of_not_existing_users(self, client):
         resp = await client.get(
@@ -1,7 +1,15 @@
+import asyncio
 import os
+import time
 
 import pytest
 
+from app.app import app
+from app.config import settings
+from app.storage.backends import LocalStorage, get_storage
+from app.storage.services import BlobService
+from app.videos.tokens import create_stream_token, encode_stream_token
+
 
 class TestUploadVideo:
     @pytest.mark.anyio
@@ -60,6 +68,52 @@ class TestUploadVideo:
         assert resp.json()["detail"] == "File type must be mp4"
 
 
+    @pytest.mark.anyio
+    async def test_upload_video_without_title(self, client, authorized_client_token, video_file):
+        resp = await client.post(
+            "/videos/upload",
+            data={
+                "description": "test description"
+            },
+            files=video_file,
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 422
+        assert resp.json()["detail"][0]["loc"] == ["body", "title"]
+
+    @pytest.mark.anyio
+    async def test_upload_video_with_too_large_field(self, client, authorized_client_token, video_file):
+        resp = await client.post(
+            "/videos/upload",
+            data={
+                "title": "test video",
+                "description": "x" * (settings.upload_max_field_size + 1)
+            },
+            files=video_file,
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 413
+        assert resp.json()["detail"] == "Form field description is too large"
+
+    @pytest.mark.anyio
+    async def test_upload_video_removes_file_on_failure(self, client, authorized_client_token, video_file, monkeypatch):
+        async def exists(self, key):
+            raise OSError("storage unavailable")
+
+        monkeypatch.setattr(LocalStorage, "exists", exists)
+        parts = set(os.listdir(settings.upload_dir))
+        with pytest.raises(OSError):
+            await client.post(
+                "/videos/upload",
+                data={
+                    "title": "test video",
+                    "description": "test description"
+                },
+                files=video_file,
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+        assert set(os.listdir(settings.upload_dir)) == parts
+
 class TestDeleteVideo:
     @pytest.mark.anyio
     async def test_success_delete_video(self, client, authorized_client_token, video_file):
@@ -153,6 +207,65 @@ class TestDeleteVideo:
         assert resp.status_code == 403
         assert resp.json()["detail"] == "Don't have permission"
 
+    @pytest.mark.anyio
+    async def test_delete_video_keeps_file_when_commit_fails(
+            self,
+            client,
+            session,
+            authorized_client_token,
+            uploaded_video_id,
+            monkeypatch
+    ):
+        etag = (await client.get(f"/videos/{uploaded_video_id}/watching")).headers["etag"]
+        path = get_storage().local_path(BlobService.blob_key(etag.strip('"')))
+
+        async def commit():
+            raise RuntimeError("commit failed")
+
+        monkeypatch.setattr(session, "commit", commit)
+        with pytest.raises(RuntimeError):
+            await client.delete(
+                f"/videos/{uploaded_video_id}",
+                headers={"Authorization": f"Bearer {authorized_client_token}"}
+            )
+        monkeypatch.undo()
+        assert os.path.exists(path)
+        resp = await client.get(f"/videos/{uploaded_video_id}/watching")
+        assert resp.status_code == 200
+
+    @pytest.mark.anyio
+    async def test_delete_video_with_shared_file(self, client, authorized_client_token):
+        video_path = os.path.join(os.path.dirname(__file__), "../assets/video_test.mp4")
+        video_ids = []
+        for _ in range(2):
+            with open(video_path, "rb") as file:
+                resp = await client.post(
+                    "/videos/upload",
+                    data={
+                        "title": "Test video",
+                        "description": "Test description"
+                    },
+                    files={"file": ("video_test.mp4", file, "video/mp4")},
+                    headers={"Authorization": f"Bearer {authorized_client_token}"}
+                )
+            video_ids.append(resp.json()["id"])
+
+        first_etag = (await client.get(f"/videos/{video_ids[0]}/watching")).headers["etag"]
+        await client.delete(
+            f"/videos/{video_ids[0]}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        resp = await client.get(f"/videos/{video_ids[1]}/watching")
+        await client.delete(
+            f"/videos/{video_ids[1]}",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+
+        assert resp.status_code == 200
+        assert resp.headers["etag"] == first_etag
+        with open(video_path, "rb") as file:
+            assert resp.content == file.read()
+
 
 class TestGetVideo:
     @pytest.mark.anyio
@@ -162,6 +275,18 @@ class TestGetVideo:
         )
         assert resp.status_code == 200
 
+    @pytest.mark.anyio
+    async def test_get_video_not_modified(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}"
+        )
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}",
+            headers={"If-None-Match": resp.headers["etag"]}
+        )
+        assert resp.status_code == 304
+        assert resp.content == b""
+
     @pytest.mark.anyio
     async def test_get_not_existing_video(self, client):
         resp = await client.get(f"/videos/999")
@@ -170,12 +295,75 @@ class TestGetVideo:
 
 
 class TestGetStreamingVideo:
-    # @pytest.mark.anyio
-    # async def test_get_streaming_video(self, client, authorized_client_token, uploaded_video_id):
-    #     resp = await client.get(
-    #         f"/videos/{uploaded_video_id}/watching"
-    #     )
-    #     assert resp.status_code == 200
+    @pytest.mark.anyio
+    async def test_get_streaming_video(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching"
+        )
+        assert resp.status_code == 200
+        assert resp.headers["accept-ranges"] == "bytes"
+        assert int(resp.headers["content-length"]) == len(resp.content)
+
+    @pytest.mark.anyio
+    async def test_get_streaming_video_range(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching",
+            headers={"Range": "bytes=0-99"}
+        )
+        assert resp.status_code == 206
+        assert resp.headers["content-range"].startswith("bytes 0-99/")
+        assert len(resp.content) == 100
+
+    @pytest.mark.anyio
+    async def test_get_streaming_video_suffix_range(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching",
+            headers={"Range": "bytes=-500"}
+        )
+        assert resp.status_code == 206
+        file_size = int(resp.headers["content-range"].rsplit("/", 1)[1])
+        assert resp.headers["content-range"] == f"bytes {file_size - 500}-{file_size - 1}/{file_size}"
+        assert len(resp.content) == 500
+
+    @pytest.mark.anyio
+    async def test_get_streaming_video_multiple_ranges(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching",
+            headers={"Range": "bytes=0-9,100-109"}
+        )
+        assert resp.status_code == 206
+        assert resp.headers["content-type"].startswith("multipart/byteranges; boundary=")
+        assert int(resp.headers["content-length"]) == len(resp.content)
+        assert b"Content-Range: bytes 100-109/" in resp.content
+
+    @pytest.mark.anyio
+    async def test_get_streaming_video_not_satisfiable_range(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching",
+            headers={"Range": "bytes=999999999-"}
+        )
+        assert resp.status_code == 416
+        assert resp.headers["content-range"].startswith("bytes */")
+
+    @pytest.mark.anyio
+    async def test_get_streaming_video_not_modified(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching"
+        )
+        etag, last_modified = resp.headers["etag"], resp.headers["last-modified"]
+
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching",
+            headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/watching",
+            headers={"If-Modified-Since": last_modified}
+        )
+        assert resp.status_code == 304
 
     @pytest.mark.anyio
     async def test_get_streaming_not_existing_video(self, client):
@@ -185,6 +373,125 @@ class TestGetStreamingVideo:
         assert resp.status_code == 404
         assert resp.json()["detail"] == "Video doesn't exist"
 
+    @pytest.mark.anyio
+    async def test_streams_release_connections(self, client, replica, uploaded_video_id):
+        client.cookies.clear()
+        statuses, checked_out = await watch_concurrently(uploaded_video_id, 500, replica.engines[0].pool)
+        assert statuses == [206] * 500
+        assert checked_out == 0
+
+    @pytest.mark.anyio
+    async def test_streams_release_primary_connections(self, client, request_sessions, uploaded_video_id):
+        checked_out_before = request_sessions.pool.checkedout()
+        statuses, checked_out = await watch_concurrently(uploaded_video_id, 20, request_sessions.pool)
+        assert statuses == [206] * 500
+        assert checked_out == checked_out_before
+
+
+async def watch_concurrently(video_id: int, streams: int, pool) -> tuple[list, int]:
+    """Opens `streams` ranged responses, returns their statuses and the connections checked out meanwhile"""
+    all_started = asyncio.Event()
+    finish = asyncio.Event()
+    started = []
+
+    async def watch():
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/videos/{video_id}/watching",
+            "raw_path": f"/videos/{video_id}/watching".encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": [(b"host", b"testserver"), (b"range", b"bytes=0-99")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80)
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            # Every viewer stays in the middle of its body until all of them got there
+            if message["type"] == "http.response.start":
+                started.append(message["status"])
+                if len(started) == streams:
+                    all_started.set()
+                await finish.wait()
+
+        await app(scope, receive, send)
+
+    tasks = [asyncio.create_task(watch()) for _ in range(streams)]
+    try:
+        await asyncio.wait_for(all_started.wait(), 60)
+        checked_out = pool.checkedout()
+    finally:
+        finish.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return started, checked_out
+
+
+class TestGetSignedStreamingVideo:
+    @pytest.mark.anyio
+    async def test_get_signed_streaming_video(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.post(f"/videos/{uploaded_video_id}/stream-token")
+        assert resp.status_code == 200
+        streaming_resp = await client.get(f"/videos/{uploaded_video_id}/watching")
+
+        resp = await client.get(resp.json()["url"], headers={"Range": "bytes=10-19"})
+        assert resp.status_code == 206
+        assert resp.headers["etag"] == streaming_resp.headers["etag"]
+        assert resp.content == streaming_resp.content[10:20]
+
+    @pytest.mark.anyio
+    async def test_get_video_page_uses_signed_url(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.post(f"/videos/{uploaded_video_id}/stream-token")
+        page = await client.get(f"/videos/{uploaded_video_id}")
+        assert resp.json()["url"] in page.text
+
+    @pytest.mark.anyio
+    async def test_get_signed_streaming_video_with_invalid_token(
+            self, client, authorized_client_token, uploaded_video_id
+    ):
+        resp = await client.post(f"/videos/{uploaded_video_id}/stream-token")
+        data, _, signature = resp.json()["token"].partition(".")
+        resp = await client.get(f"/videos/stream/{data}.{signature[::-1]}")
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "Invalid stream token"
+
+    @pytest.mark.anyio
+    async def test_get_signed_streaming_video_with_expired_token(self, client):
+        payload = create_stream_token("blobs/00/00.mp4", None, 100, 0, now=time.time() - 3 * settings.stream_token_ttl)
+        resp = await client.get(f"/videos/stream/{encode_stream_token(payload)}")
+        assert resp.status_code == 403
+        assert resp.json()["detail"] == "Stream token expired"
+
+    @pytest.mark.anyio
+    async def test_create_stream_token_for_not_existing_video(self, client):
+        resp = await client.post("/videos/999/stream-token")
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "Video doesn't exist"
+
+
+class TestGetVideoStatus:
+    @pytest.mark.anyio
+    async def test_get_video_status(self, client, authorized_client_token, uploaded_video_id):
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/status"
+        )
+        assert resp.status_code == 200
+        assert resp.json() == {"id": uploaded_video_id, "status": "ready"}
+
+    @pytest.mark.anyio
+    async def test_get_not_existing_video_status(self, client):
+        resp = await client.get(
+            f"/videos/999/status"
+        )
+        assert resp.status_code == 404
+        assert resp.json()["detail"] == "Video doesn't exist"
+
 
 class TestUpdateVideo:
     @pytest.mark.anyio
@@ -201,6 +508,38 @@ class TestUpdateVideo:
         assert resp.json()["title"] == "new title"
         assert resp.json()["description"] == "new description"
 
+    @pytest.mark.anyio
+    async def test_update_video_with_foreign_comment(self, client, authorized_client_token, uploaded_video_id):
+        await client.post(
+            "/auth/sign-up",
+            json={
+                "email": "second@test.com",
+                "username": "second_user",
+                "password": "qwerty"
+            }
+        )
+        resp = await client.post(
+            "/auth/sign-in",
+            data={
+                "username": "second@test.com",
+                "password": "qwerty"
+            }
+        )
+        await client.post(
+            f"/videos/{uploaded_video_id}/comments",
+            json={"text": "test comment"},
+            headers={"Authorization": f"Bearer {resp.json()['access_token']}"}
+        )
+
+        resp = await client.patch(
+            f"/videos/{uploaded_video_id}",
+            json={"title": "new title"},
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        assert resp.status_code == 200
+        assert resp.json()["comments"][0]["author"]["username"] == "second_user"
+        assert resp.json()["comments_count"] == 1
+
     @pytest.mark.anyio
     async def test_update_video_by_by_unauthorized_user(self, client, authorized_client_token, uploaded_video_id):
         resp = await client.patch(
@@ -271,6 +610,31 @@ class TestGetVideoLikes:
         assert resp.status_code == 200
         assert resp.json() == [{"username": "test", "id": 1}]
 
+    @pytest.mark.anyio
+    async def test_get_cached_likes(self, client, authorized_client_token, uploaded_video_id, count_queries):
+        await client.put(
+            f"/videos/{uploaded_video_id}/likes",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        await client.get(
+            f"/videos/{uploaded_video_id}/likes"
+        )
+        with count_queries() as queries:
+            resp = await client.get(
+                f"/videos/{uploaded_video_id}/likes"
+            )
+        assert resp.json() == [{"username": "test", "id": 1}]
+        assert queries == []
+
+        await client.delete(
+            f"/videos/{uploaded_video_id}/likes",
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
+        resp = await client.get(
+            f"/videos/{uploaded_video_id}/likes"
+        )
+        assert resp.json() == []
+
     @pytest.mark.anyio
     async def test_get_not_existing_video_likes(self, client):
         resp = await client.get(
@@ -290,8 +654,14 @@ class TestLikeVideo:
         get_likes_resp = await client.get(
             f"/videos/{uploaded_video_id}/likes"
         )
+        video_resp = await client.patch(
+            f"/videos/{uploaded_video_id}",
+            json={},
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
         assert like_resp.status_code == 200
         assert get_likes_resp.json() == [{"username": "test", "id": 1}]
+        assert video_resp.json()["likes"] == 1
 
     @pytest.mark.anyio
     async def test_like_not_existing_video(self, client, authorized_client_token):
@@ -323,8 +693,14 @@ class TestLikeVideo:
         get_likes_resp = await client.get(
             f"/videos/{uploaded_video_id}/likes"
         )
+        video_resp = await client.patch(
+            f"/videos/{uploaded_video_id}",
+            json={},
+            headers={"Authorization": f"Bearer {authorized_client_token}"}
+        )
         assert like_resp.status_code == 200
         assert get_likes_resp.json() == [{"username": "test", "id": 1}]
+        assert video_resp.json()["likes"] == 1
 
 
 class TestUnlikeVideo:
@@ -1,14 +1,19 @@
+import contextlib
 import logging
 import os
+import re
 
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import text
+from sqlalchemy import text, event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 from app.app import app
+from app.cache.services import get_cache
+from app.database import replicas
 from app.database.database import Base, get_session
+from app.database.replicas import ReplicaSet
 from app.database.db_config import get_sqlalchemy_url
 from app.users.schemas import UserCreateSchema
 
@@ -53,7 +58,7 @@ async def clear_db(session):
     try:
         for table in Base.metadata.tables:
             await session.execute(text(f"TRUNCATE {table} CASCADE"))
-            if table not in ("subscribers", "videos_likes"):
+            if table not in ("subscribers", "videos_likes", "uploads", "blobs", "feed"):
                 await session.execute(text(f"ALTER SEQUENCE {table}_id_seq RESTART WITH 1"))
 
             await session.commit()
@@ -61,6 +66,13 @@ async def clear_db(session):
         logging.warning(err)
 
 
+@pytest.fixture(autouse=True, scope="function")
+async def clear_cache():
+    yield
+    # Ids restart with the tables, cached entries would describe rows of the previous test
+    await get_cache().clear()
+
+
 @pytest.fixture
 def user_to_create():
     return UserCreateSchema(
@@ -116,6 +128,52 @@ async def uploaded_video_id(client, authorized_client_token, video_file):
     )
 
 
+class QueryLog(list):
+    def count(self, verb: str, table: str) -> int:
+        pattern = re.compile(rf"^\s*{verb}\b.*\b{table}\b", re.IGNORECASE | re.DOTALL)
+        return sum(1 for statement in self if pattern.match(statement))
+
+
+@pytest.fixture
+def count_queries(session):
+    """Collects the statements sent to the test database inside the `with` block"""
+    @contextlib.contextmanager
+    def counter():
+        queries = QueryLog()
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            queries.append(statement)
+
+        event.listen(session.bind.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            yield queries
+        finally:
+            event.remove(session.bind.sync_engine, "before_cursor_execute", on_execute)
+
+    return counter
+
+
+@pytest.fixture
+async def replica(client, session, monkeypatch):
+    # The test database stands in for a replica, so its data matches the primary
+    replica_set = ReplicaSet([session.bind.url.render_as_string(hide_password=False)], retry_interval=60)
+    monkeypatch.setattr(replicas, "replicas", replica_set)
+    yield replica_set
+    client.cookies.clear()
+    await replica_set.dispose()
+
+
+@pytest.fixture
+def request_sessions(client, monkeypatch):
+    """Gives every request its own session of the test engine, as get_session does in the app"""
+    async def _get_session():
+        async with async_session() as session:
+            yield session
+
+    monkeypatch.setitem(app.dependency_overrides, get_session, _get_session)
+    return engine
+
+
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"